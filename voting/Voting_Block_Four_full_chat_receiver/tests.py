@@ -0,0 +1,23 @@
+from otree.api import Bot, Submission, SubmissionMustFail, expect
+from . import *
+import random
+
+
+# Submission(page, check_html=False): the page's only button is added by JS
+class PlayerBot(Bot):
+    def play_round(self):
+        if self.round_number == 1:
+            yield Submission(Block_four_instructions, check_html=False)
+            yield SubmissionMustFail(Comprehension_Test, dict(quiz1=0, quiz2=1))
+            yield Comprehension_Test, dict(quiz1=1, quiz2=1)
+
+        codes = [code for code, label in self.player.reveal_decision_choices()]
+        yield Info_and_decision, dict(reveal_decision=random.choice(codes))
+
+        # own source is always known after the info flow is resolved
+        expect(self.player.info_mask & (1 << (self.player.id_in_group - 1)), '!=', 0)
+        yield network_and_voting, dict(vote=random.choice('RB'))
+
+        if self.round_number == C.NUM_ROUNDS:
+            yield Submission(FinalResults, check_html=False)
+            expect(self.player.selected_round, '<=', C.NUM_ROUNDS)
@@ -1,6 +1,11 @@
 from otree.api import *
-import random
-from itertools import permutations
+
+from voting_core import (
+    TimedPage, TimedWaitPage, barrier_report_vars, init_schedule,
+    merge_barriers, pay_random_round, posterior_export, private_info_vars,
+    quiz_errors, schedule_report_vars, set_payoffs, start_round,
+)
+from voting_core.export import round_export
 
 doc = """
 Three-player voting experiment individual+nochat.
@@ -15,92 +20,31 @@ class C(BaseConstants):
     CHOICES           = [('R', 'RED Box'), ('B', 'BLUE Box')]
     STATES            = ['R', 'B']
     QUALITIES         = ['h', 'l']
+    BLOCK             = 'one'
+    TRIPLE_SECTIONS   = [(0, 6, 8), (6, 17, 8), (17, 20, 2), (20, 24, 2)]
+    ROWS_FIRST        = False
+    TAGS_FROM_RECORD  = False
+    GROUP_PAYOFF      = False
 
 
-# ------------------------------------------------------------------
-#  build pre-generated signal table
-# ------------------------------------------------------------------
-def build_signal_table_one(M: int = 1000):
-    """generate M data points"""
-    table = []
-    for _ in range(M):
-        state = random.choice(C.STATES)
-        group = {'state': state, 'players': {}}
-        for pid in (1, 2, 3):
-            qual = 'h' if random.random() < 0.30 else 'l'
-            if state == 'R':
-                sig = 'r' if (qual == 'h' and random.random() < 8/9) or \
-                             (qual == 'l' and random.random() < 5/9) else 'b'
-            else:
-                sig = 'r' if (qual == 'h' and random.random() < 1/9) or \
-                             (qual == 'l' and random.random() < 4/9) else 'b'
-            group['players'][pid] = {'qualities': qual, 'signals': sig}
-        table.append(group)
-    return table
-
-
-# ================================================================
-# Triplet patterns (22 rows × 2 each = 44 triples)
-# ================================================================
-TRIPLE_ROWS: list[tuple[tuple[str, str, str], tuple[str, str, str]]] = [
-    (('rh', 'bh', 'rl'), ('bh', 'rh', 'bl')),
-    (('rh', 'bh', 'rh'), ('bh', 'rh', 'bh')),
-    (('rh', 'bl', 'rh'), ('bh', 'rl', 'bh')),
-    (('rh', 'bl', 'rl'), ('bh', 'rl', 'bl')),
-    (('rl', 'bh', 'rl'), ('bl', 'rh', 'bl')),
-    (('rl', 'bl', 'rl'), ('bl', 'rl', 'bl')),
-    (('r', 'bh', 'r'), ('b', 'rh', 'b')),
-    (('r', 'bl', 'r'), ('b', 'rl', 'b')),
-    (('rh', 'b', 'r'),   ('bh', 'r', 'b')),
-    (('rl', 'b', 'r'),   ('bl', 'r', 'b')),
-    (('rh', 'bh', 'r'),  ('bh', 'rh', 'b')),
-    (('rh', 'bl', 'r'),  ('bh', 'rl', 'b')),
-    (('rl', 'bh', 'r'),  ('bl', 'rh', 'b')),
-    (('rl', 'bl', 'r'),  ('bl', 'rl', 'b')),
-    (('rh', 'b', 'rl'),  ('bh', 'r', 'bl')),
-    (('rh', 'b', 'rh'),  ('bh', 'r', 'bh')),
-    (('rl', 'b', 'rl'),  ('bl', 'r', 'bl')),
-    (('rl', '', ''),     ('bl', '', '')),
-    (('rh', '', ''),     ('bh', '', '')),
-    (('r',   '', ''),    ('b',  '', '')),
-    (('r', 'bl', ''), ('b', 'rl', '')),
-    (('rh', 'b', ''),    ('bh', 'r', '')),
-    (('rh', 'bl', ''),   ('bh', 'rl', '')),
-    (('rh',  'bh', ''),  ('bl', 'rl', '')),
-]
-ALL_TRIPLES: list[tuple[str, str, str]] = [t for pair in TRIPLE_ROWS for t in pair]
-
-
-def expand_triplet(trip: tuple[str, str, str]) -> list[str]:
-    patterns = []
-    for i, tag in enumerate(trip):
-        others = [trip[j] for j in range(3) if j != i]
-        others.sort()
-        others_disp = [(o if o else '0') for o in others]
-        patterns.append(f"{tag}+{''.join(others_disp)}")
-    return patterns
-
-
+class Subsession(BaseSubsession):
+    pass
 
 
-class Subsession(BaseSubsession):
-    def creating_session(self):
-        if self.round_number == 1:
-            self.session.vars['signal_table_one'] = build_signal_table_one(1000)
-            self.session.vars['used_records_one'] = set()
+def creating_session(subsession):
+    if subsession.round_number == 1:
+        init_schedule(subsession.session, C)
 
 
 class Group(BaseGroup):
     state   = models.StringField()
 
     def set_payoffs(self):
-        for p in self.get_players():
-            p.payoff_record = C.AMOUNT_CORRECT if p.vote == self.state else 0
-
+        set_payoffs(self, C)
 
 
 class Player(BasePlayer):
-    timeSpent = models.FloatField()
+    page_events     = models.StringField(blank=True)   # voting_core.TimedPage
     vote            = models.StringField(widget=widgets.RadioSelect,
                                          choices=C.CHOICES)
     state     = models.StringField()
@@ -217,122 +161,26 @@ class Player(BasePlayer):
 # ------------------------------------------------------------------
 # WaitPage – pattern assignment
 # ------------------------------------------------------------------
-class StartRoundWaitPage(WaitPage):
+class StartRoundWaitPage(TimedWaitPage):
     wait_for_all_groups = True
 
-    @staticmethod
-    def _pattern_match(slot_tag, pattern, others_tags):
-        if '+' not in pattern:
-            left, right = pattern, ''
-        else:
-            left, right = pattern.split('+', 1)
-
-
-        if left == '':
-            own_ok = True
-        elif len(left) == 1:
-            own_ok = (slot_tag and slot_tag[0] == left)
-        else:
-            own_ok = (slot_tag == left)
-        if not own_ok:
-            return False
-
-        if right:
-            required = [right[i:i+2] for i in range(0, len(right), 2)]
-            return sorted(required) == sorted(others_tags)
-        return True
-
     def after_all_players_arrive(self):
-        # 1. 随机分组
-        self.subsession.group_randomly()
-
-        sv = self.session.vars
-        # 2. 初始化信号表 & 已用索引
-        if 'signal_table_one' not in sv:
-            sv['signal_table_one'] = build_signal_table_one(1000)
-            sv['used_records_one'] = set()
-        table = sv['signal_table_one']
-        used_idx = sv['used_records_one']
-
-        # 3. 生成 triple_order_one（首次执行）
-        if 'triple_order_one' not in sv:
-            section_slices = [
-                (0, 6, 8), (6, 17, 8), (17, 20, 2), (20, 24, 2)
-            ]
-            picks: list[tuple[str,str,str]] = []
-            for start, end, quota in section_slices:
-                pairs = TRIPLE_ROWS[start:end]
-                num_pairs = len(pairs)
-                if quota <= num_pairs:
-                    idxs = random.sample(range(start, end), quota)
-                    picks.extend(random.choice(TRIPLE_ROWS[i]) for i in idxs)
-                else:
-                    row_picks = [random.choice(pair) for pair in pairs]
-                    flat = [t for pair in pairs for t in pair]
-                    remaining = [t for t in flat if t not in row_picks]
-                    extras = random.sample(remaining, quota - num_pairs)
-                    picks.extend(row_picks + extras)
-            random.shuffle(picks)
-            sv['triple_order_one'] = picks
-
-        # 4. 本轮部分信息模板
-        trip_this_round = sv['triple_order_one'][self.subsession.round_number - 1]
-        round_patterns = expand_triplet(trip_this_round)
-        sv['pair_patterns_one'] = round_patterns
-
-        # 5. 对每个 group 进行匹配
-        for g in self.subsession.get_groups():
-            # 5.1 计算每位玩家的未见过 patterns
-            needs: dict[int, list[str]] = {}
-            for p in g.get_players():
-                seen = p.participant.vars.get('patterns_seen_three', [])
-                unseen = [pat for pat in round_patterns if pat not in seen]
-                needs[p.id_in_subsession] = unseen or list(round_patterns)
-
-            tags_template = list(trip_this_round)  # e.g. ['rh','b','']
-            best_match = None
-
-            # —— 5.2/5.3 简化：直接随机抽一条未用记录 ——
-            unused = [i for i in range(len(table)) if i not in used_idx]
-            idx = random.choice(unused)
-            rec = table[idx]
-            used_idx.add(idx)
-
-            # 分配 state
-            state = rec['state']
-            g.state = state
-            for p in g.get_players():
-                p.state = state
-
-            # 按原始顺序 tags_template 分配 pattern、signal 和 quality
-            patterns = expand_triplet(tuple(tags_template))
-            for p, tag, pat in zip(g.get_players(), tags_template, patterns):
-                p.current_pattern = pat
-                if tag == '':
-                    p.signals, p.qualities = '', ''
-                elif len(tag) == 1:
-                    p.signals, p.qualities = tag, ''
-                else:
-                    p.signals, p.qualities = tag[0], tag[1]
-                p.participant.vars.setdefault('patterns_seen_three', []).append(pat)
-
-            # 存回 session.vars
-            sv['used_records_one'] = used_idx
-
-
-class Welcome(Page):
+        start_round(self.subsession, C)
+
+
+class Welcome(TimedPage):
     @staticmethod
     def is_displayed(player):
         return player.round_number == 1
 
 
-class Overview(Page):
+class Overview(TimedPage):
     @staticmethod
     def is_displayed(player):
         return player.round_number == 1
 
 
-class General_setting_of_the_experiment(Page):
+class General_setting_of_the_experiment(TimedPage):
     @staticmethod
     def is_displayed(player):
         return player.round_number == 1
@@ -340,187 +188,121 @@ class General_setting_of_the_experiment(Page):
 
 
 
-class Comprehension_Test1(Page):
+class Comprehension_Test1(TimedPage):
     form_model = 'player'
     form_fields = ['quiz1', 'quiz2', 'quiz3', 'quiz4', 'quiz5']
 
     @staticmethod
     def error_message(player: Player, values):
-        solutions1 = {"quiz1": 0, "quiz2": 0, "quiz3": 0,  "quiz4": 1, "quiz5": 1}
-        errors1 = {name: 'Wrong' for name in solutions1 if values[name] != solutions1[name]}
-        if errors1:
-            player.num_failed_attempts1 += 1
-            if player.num_failed_attempts1 >= 100:
-                player.failed_too_many1 = True
-            else:
-                return errors1
+        solutions = {"quiz1": 0, "quiz2": 0, "quiz3": 0,  "quiz4": 1, "quiz5": 1}
+        return quiz_errors(player, values, solutions, 'num_failed_attempts1', 'failed_too_many1')
+
     @staticmethod
     def is_displayed(player: Player):
         return player.round_number == 1
 
 
-class ResultsWaitPagea(WaitPage):
+class ResultsWaitPagea(TimedWaitPage):
     wait_for_all_groups = True
 
     @staticmethod
     def is_displayed(player: Player):
         return player.round_number == 1
 
-class Examples(Page):
+class Examples(TimedPage):
     @staticmethod
     def is_displayed(player):
         return player.round_number == 1
 
 
-class Comprehension_Test2(Page):
+class Comprehension_Test2(TimedPage):
     form_model = 'player'
     form_fields = ['quiz7', 'quiz8', 'quiz9']
 
     @staticmethod
     def error_message(player: Player, values):
-        solutions2 = {"quiz7": 2, "quiz8": 2, 'quiz9': 0}
-        errors2 = {name: 'Wrong' for name in solutions2 if values[name] != solutions2[name]}
-        if errors2:
-            player.num_failed_attempts2 += 1
-            if player.num_failed_attempts2 >= 100:
-                player.failed_too_many2 = True
-            else:
-                return errors2
+        solutions = {"quiz7": 2, "quiz8": 2, 'quiz9': 0}
+        return quiz_errors(player, values, solutions, 'num_failed_attempts2', 'failed_too_many2')
+
     @staticmethod
     def is_displayed(player: Player):
         return player.round_number == 1
 
 
-class ResultsWaitPageb(WaitPage):
+class ResultsWaitPageb(TimedWaitPage):
     wait_for_all_groups = True
 
     @staticmethod
     def is_displayed(player: Player):
         return player.round_number == 1
 
-class Block_one_instructions(Page):
+class Block_one_instructions(TimedPage):
     @staticmethod
     def is_displayed(player):
         return player.round_number == 1
 
 
-class Comprehension_Test3(Page):
+class Comprehension_Test3(TimedPage):
     form_model = 'player'
     form_fields = ['quiz10', 'quiz11']
 
     @staticmethod
     def error_message(player: Player, values):
-        solutions3 = {"quiz10": 0, "quiz11": 2}
-        errors3 = {name: 'Wrong' for name in solutions3 if values[name] != solutions3[name]}
-        if errors3:
-            player.num_failed_attempts3 += 1
-            if player.num_failed_attempts3 >= 100:
-                player.failed_too_many3 = True
-            else:
-                return errors3
+        solutions = {"quiz10": 0, "quiz11": 2}
+        return quiz_errors(player, values, solutions, 'num_failed_attempts3', 'failed_too_many3')
+
     @staticmethod
     def is_displayed(player: Player):
         return player.round_number == 1
 
 
-
-class ResultsWaitPage1(WaitPage):
+class ResultsWaitPage1(TimedWaitPage):
     wait_for_all_groups = True
 
+    @staticmethod
+    def is_displayed(player):
+        return not merge_barriers(player)
+
+
+class ResultsWaitPage1Group(TimedWaitPage):
+    @staticmethod
+    def is_displayed(player):
+        return merge_barriers(player)
 
-class network_and_voting(Page):
-    form_model = 'player'
-    form_fields = ['timeSpent', 'vote']
 
+class network_and_voting(TimedPage):
+    form_model = 'player'
+    form_fields = ['vote']
 
     @staticmethod
     def vars_for_template(player):
-        # —— 自己的信息 ——
-        if player.qualities == 'h':
-            my_quality = 'strong source'
-        elif player.qualities == 'l':
-            my_quality = 'weak source'
-        else:
-            my_quality = 'unknown'
-
-        if player.signals == 'r':
-            my_signal_style = (
-                'height:1.4em;width:1.4em;'
-                'background-color:red;'
-                'border-radius:50%;display:inline-block;'
-                'vertical-align:middle;margin:0 0px;'
-            )
-        elif player.signals == 'b':
-            my_signal_style = (
-                'height:1.4em;width:1.4em;'
-                'background-color:blue;'
-                'border-radius:50%;display:inline-block;'
-                'vertical-align:middle;margin:0 0px;'
-            )
-        else:
-            my_signal_style = 'unknown'
-
-        # —— 其他人 ——
-        others = []
-        for p in player.get_others_in_group():
-            # 质量标签
-            if p.qualities == 'h':
-                qlabel = 'strong source'
-            elif p.qualities == 'l':
-                qlabel = 'weak source'
-            else:
-                qlabel = 'unknown'
-
-            # 信号样式
-            if p.signals in ('r', 'b'):
-                color = 'red' if p.signals == 'r' else 'blue'
-                sig_style = (
-                    'height:1.4em;width:1.4em;'
-                    f'background-color:{color};'
-                    'border-radius:50%;display:inline-block;'
-                    'vertical-align:middle;margin:0 0px;'
-                )
-            else:
-                sig_style = 'unknown'
-
-            others.append({
-                'id': p.id_in_group,
-                'quality_label': qlabel,
-                'signal_style': sig_style,
-            })
-
-        return dict(
-            my_quality=my_quality,
-            my_signal_style=my_signal_style,
-            my_id=player.id_in_group,
-            other_urns=others,
-        )
-
-
-class ResultsWaitPage3(WaitPage):
+        return private_info_vars(player)
+
+
+class ResultsWaitPage3(TimedWaitPage):
     def after_all_players_arrive(self):
         self.group.set_payoffs()
 
 
-class ResultsWaitPage4(WaitPage):
+class ResultsWaitPage4(TimedWaitPage):
     wait_for_all_groups = True
 
+    @staticmethod
+    def is_displayed(player):
+        return not merge_barriers(player)
+
 
-class ResultsWaitPage5(WaitPage):
+class ResultsWaitPage5(TimedWaitPage):
 
     @staticmethod
     def is_displayed(player):
         return player.round_number == C.NUM_ROUNDS
 
     def after_all_players_arrive(self):
-        rnd = random.randint(1, C.NUM_ROUNDS)
-        for p in self.group.get_players():
-            p.selected_round = rnd
-            p.payoff = p.in_round(rnd).payoff_record
-            p.participant.vars[__name__] = [int(p.payoff), rnd]
+        pay_random_round(self.group, C, __name__)
 
 
-class FinalResults(Page):
+class FinalResults(TimedPage):
     @staticmethod
     def is_displayed(player):
         return player.round_number == C.NUM_ROUNDS
@@ -542,9 +324,24 @@ page_sequence = [
     Block_one_instructions,
     Comprehension_Test3,
     ResultsWaitPage1,
+    ResultsWaitPage1Group,
     network_and_voting,
     ResultsWaitPage3,
     ResultsWaitPage4,
     ResultsWaitPage5,
     FinalResults,
 ]
+
+
+def custom_export(players):
+    yield from posterior_export(players, C)
+
+
+# one typed row per player-round (voting_core.export); on the Data page
+# from oTree 6 on, through `python -m voting_core.export` before that
+def custom_export_rounds(players):
+    yield from round_export(players, C)
+
+
+def vars_for_admin_report(subsession):
+    return dict(**schedule_report_vars(subsession, C), **barrier_report_vars(subsession))
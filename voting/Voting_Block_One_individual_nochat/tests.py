@@ -0,0 +1,26 @@
+from otree.api import Bot, Submission, SubmissionMustFail, expect
+from . import *
+import random
+
+
+# Submission(page, check_html=False): the page's only button is added by JS
+class PlayerBot(Bot):
+    def play_round(self):
+        if self.round_number == 1:
+            yield Submission(Welcome, check_html=False)
+            yield Submission(Overview, check_html=False)
+            yield Submission(General_setting_of_the_experiment, check_html=False)
+            yield SubmissionMustFail(Comprehension_Test1, dict(quiz1=1, quiz2=0, quiz3=0, quiz4=1, quiz5=1))
+            yield Comprehension_Test1, dict(quiz1=0, quiz2=0, quiz3=0, quiz4=1, quiz5=1)
+            expect(self.player.num_failed_attempts1, 1)
+            yield Submission(Examples, check_html=False)
+            yield Comprehension_Test2, dict(quiz7=2, quiz8=2, quiz9=0)
+            yield Submission(Block_one_instructions, check_html=False)
+            yield Comprehension_Test3, dict(quiz10=0, quiz11=2)
+
+        expect(self.player.current_pattern, '!=', None)
+        yield network_and_voting, dict(vote=random.choice('RB'))
+
+        if self.round_number == C.NUM_ROUNDS:
+            yield Submission(FinalResults, check_html=False)
+            expect(self.player.selected_round, '<=', C.NUM_ROUNDS)
@@ -0,0 +1,19 @@
+from otree.api import Bot, Submission, SubmissionMustFail, expect
+from . import *
+import random
+
+
+# Submission(page, check_html=False): the page's only button is added by JS
+class PlayerBot(Bot):
+    def play_round(self):
+        if self.round_number == 1:
+            yield Submission(Block_two_instructions, check_html=False)
+            yield SubmissionMustFail(Comprehension_Test1, dict(quiz1=0, quiz2=1))
+            yield Comprehension_Test1, dict(quiz1=1, quiz2=1)
+
+        expect(self.player.current_pattern, '!=', None)
+        yield network_and_voting, dict(vote=random.choice('RB'))
+
+        if self.round_number == C.NUM_ROUNDS:
+            yield Submission(FinalResults, check_html=False)
+            expect(self.player.selected_round, '<=', C.NUM_ROUNDS)
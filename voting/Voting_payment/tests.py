@@ -0,0 +1,15 @@
+from otree.api import Bot, Submission, expect
+from . import *
+
+
+# Submission(page, check_html=False): the page's only button is added by JS
+class PlayerBot(Bot):
+    def play_round(self):
+        yield Submission(Instruction, check_html=False)
+        yield Survey, dict(
+            Gender=3, Major='Economics', Age='21', Education=1, Bayes=1,
+            How_choose_state='majority', How_choose_info='random',
+        )
+        expect(self.player.total_to_pay, '>=', 5)
+        yield Email, dict(Email_address='bot@example.com')
+        yield Submission(Payment, check_html=False)
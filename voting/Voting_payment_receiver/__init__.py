@@ -3,6 +3,8 @@ import re
 import random
 import json
 
+from voting_core import TimedPage, barrier_export
+
 doc = """
 reflect the payment in the end
 """
@@ -24,6 +26,7 @@ class Group(BaseGroup):
 
 
 class Player(BasePlayer):
+    page_events = models.StringField(blank=True)   # voting_core.TimedPage
     round_to_pay_block_one = models.StringField()
     money_to_pay_block_one = models.IntegerField()
     round_to_pay_block_two = models.IntegerField()
@@ -67,12 +70,12 @@ class Player(BasePlayer):
         ]
     )
 
-class Instruction(Page):
+class Instruction(TimedPage):
     pass
 
 
 
-class Survey(Page):
+class Survey(TimedPage):
     form_model = 'player'
     form_fields = ['Gender', 'Major', 'Age', 'Education', 'Bayes', 'How_choose_state', 'How_choose_info']
     @staticmethod
@@ -104,14 +107,19 @@ class Survey(Page):
         part.payoff = player.total_to_pay
 
 
-class Email(Page):
+class Email(TimedPage):
     form_model = 'player'
     form_fields = ['Email_address']
 
 
 
-class Payment(Page):
+class Payment(TimedPage):
     pass
 
 
-page_sequence = [Instruction, Survey, Email, Payment]
\ No newline at end of file
+page_sequence = [Instruction, Survey, Email, Payment]
+
+
+# session-wide wait-page timings (voting_core.timing.BarrierTiming)
+def custom_export(players):
+    yield from barrier_export(players)
@@ -0,0 +1,40 @@
+// Page timing recorder, loaded by voting_core/page_timing.html.
+// On submit it adds a hidden 'page_events' input holding
+//   visible,first_input,decision,submit,hidden
+// in ms since the page was requested (empty when it never happened);
+// voting_core.TimedPage appends it to participant.page_log.
+(function () {
+    const t = {visible: null, first: null, decision: null, hidden: 0};
+    let hiddenSince = null;
+    const now = () => Math.round(performance.now());
+
+    function visibility() {
+        if (document.visibilityState === 'visible') {
+            if (t.visible === null) t.visible = now();
+            if (hiddenSince !== null) { t.hidden += now() - hiddenSince; hiddenSince = null; }
+        } else if (hiddenSince === null) {
+            hiddenSince = now();
+        }
+    }
+    visibility();
+    document.addEventListener('visibilitychange', visibility);
+
+    function interact() { if (t.first === null) t.first = now(); }
+    document.addEventListener('pointerdown', interact, true);
+    document.addEventListener('keydown', interact, true);
+
+    // last change to a named field, i.e. the answer that was submitted
+    document.addEventListener('change', e => { if (e.target.name) t.decision = now(); }, true);
+
+    document.addEventListener('submit', e => {
+        let input = e.target.querySelector('input[name="page_events"]');
+        if (!input) {
+            input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = 'page_events';
+            e.target.appendChild(input);
+        }
+        input.value = [t.visible, t.first, t.decision, now(), t.hidden]
+            .map(v => v === null ? '' : v).join(',');
+    }, true);
+})();
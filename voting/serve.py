@@ -0,0 +1,34 @@
+"""
+The `otree` command with the PostgreSQL production profile
+(voting_core.dbprofile) applied:
+
+    python serve.py prodserver1of2
+    python serve.py resetdb
+
+The engine is swapped right before oTree loads the apps and opens its
+first connection. Nothing is imported any earlier than under `otree`, and
+off Postgres this is plain `otree`.
+"""
+import otree.main
+
+_setup = otree.main.setup
+
+
+def setup():
+    import otree.database
+
+    init_orm = otree.database.init_orm
+
+    def init_orm_with_profile():
+        from voting_core.dbprofile import configure_engine
+
+        configure_engine()
+        init_orm()
+
+    otree.database.init_orm = init_orm_with_profile
+    _setup()
+
+
+if __name__ == '__main__':
+    otree.main.setup = setup
+    otree.main.execute_from_command_line()
@@ -21,10 +21,16 @@ SESSION_CONFIGS = [
 ]
 
 SESSION_CONFIG_DEFAULTS = dict(
-    real_world_currency_per_point=1.00, participation_fee=0.00, doc=""
+    real_world_currency_per_point=1.00, participation_fee=0.00, doc="",
+    # True: skip the wait pages that do no work / downgrade them to group waits
+    merge_barriers=False,
+    # '' draws a fresh seed; a session's seed is on its block admin reports
+    # and reusing it replays every draw (voting_core.rng)
+    rng_seed='',
 )
 
-PARTICIPANT_FIELDS = []
+# page_log: client page timings, see voting_core.TimedPage
+PARTICIPANT_FIELDS = ['page_log']
 SESSION_FIELDS = []
 
 
@@ -43,6 +49,11 @@ ROOMS = [
         #use_secure_urls=True
     ),
 ]
+# label-free rooms LoadTest1, LoadTest2, ... for voting_core.loadtest --rooms
+ROOMS += [
+    dict(name=f'LoadTest{i}', display_name=f'Load test {i}')
+    for i in range(1, int(environ.get('VOTING_LOADTEST_ROOMS') or 0) + 1)
+]
 
 ADMIN_USERNAME = 'admin'
 
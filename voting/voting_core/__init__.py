@@ -0,0 +1,24 @@
+"""
+Shared engine for the voting blocks.
+
+The block apps only declare their models, pages and treatment constants
+on C; schedule, assignment, share/receive resolution, payoffs and
+template variables all live here.
+"""
+from .signal_table import SignalTable, PackedSignalTable, build_signal_table
+from .triplets import TRIPLE_ROWS, ALL_TRIPLES, expand_triplet
+from .assignment import start_round
+from .rng import session_seed, stream
+from .schedule import BlockSchedule, init_schedule, schedule_report_vars
+from .network import decision_choices, resolve_info_flow
+from .snapshot import Member, group_snapshot
+from .payoffs import set_payoffs, pay_random_round
+from .rendering import private_info_vars, decision_info_vars, network_vars
+from .quiz import quiz_errors
+from .barriers import merge_barriers
+from .posterior import POSTERIORS, Posterior, lookup, posterior_export
+from .timing import (
+    BarrierArrival, BarrierTiming, TimedPage, TimedWaitPage, barrier_export,
+    barrier_report_vars,
+)
+from .dbprofile import configure_engine
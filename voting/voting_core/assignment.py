@@ -0,0 +1,67 @@
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .bulk import bulk_update
+from .schedule import init_schedule, schedule_key
+from .triplets import expand_triplet
+
+
+# ------------------------------------------------------------------
+#  Round start: groups, triplet and signals
+# ------------------------------------------------------------------
+def start_round(subsession, C):
+    """
+    read this round out of the block's schedule (built in
+    creating_session by init_schedule) and write it back
+    """
+    sv = subsession.session.vars
+    if schedule_key(C) not in sv:
+        init_schedule(subsession.session, C)
+    schedule = sv[schedule_key(C)]
+    r = subsession.round_number
+
+    # 1. this round's groups, ordered by slot
+    matrix = schedule.matrix(r)
+    players = regroup(subsession, matrix)
+
+    # 2. per-group signals, computed in memory ...
+    group_rows, player_rows = [], []
+    for g, ids, tags, state in zip(subsession.get_groups(), matrix,
+                                   schedule.group_tags(r), schedule.group_states(r)):
+        group_fields = dict(state=state)
+        if C.TAGS_FROM_RECORD:
+            r_count = sum(1 for tag in tags if tag[:1] == 'r')
+            group_fields.update(r_count=r_count, b_count=C.PLAYERS_PER_GROUP - r_count)
+        group_rows.append((g, group_fields))
+
+        # slot i goes to the i-th player of the group
+        for pid, tag, pat in zip(ids, tags, expand_triplet(tags)):
+            sig, qual = _split_tag(tag)
+            player_rows.append((players[pid], dict(group_fields, signals=sig,
+                                                   qualities=qual, current_pattern=pat)))
+
+    # ... and written back with one UPDATE per table
+    bulk_update(group_rows)
+    bulk_update(player_rows)
+
+
+def regroup(subsession, matrix):
+    """
+    set_group_matrix for a round whose groups hold no data yet: keeps the
+    round's Group rows and moves every player with one UPDATE, instead of
+    recreating the groups and committing once per group.
+    Returns the round's players by id_in_subsession.
+    """
+    players = {p.id_in_subsession: p for p in subsession.get_players()}
+    groups = subsession.get_groups()
+    rows = [(players[pid], dict(group_id=g.id, id_in_group=i))
+            for g, ids in zip(groups, matrix) for i, pid in enumerate(ids, start=1)]
+    bulk_update(rows)
+    for g, ids in zip(groups, matrix):
+        for pid in ids:
+            set_committed_value(players[pid], 'group', g)
+    return players
+
+
+def _split_tag(tag: str) -> tuple[str, str]:
+    """'rh' → ('r', 'h'), 'r' → ('r', ''), '' → ('', '')"""
+    return tag[:1], tag[1:]
@@ -0,0 +1,13 @@
+# ------------------------------------------------------------------
+#  Merged wait pages
+# ------------------------------------------------------------------
+#   session.config['merge_barriers']
+#       False – every round passes through all of its wait pages
+#       True  – barriers that do no work are merged away:
+#               ResultsWaitPage1 becomes a group-level wait (players still
+#               enter the decision page together with their own group);
+#               ResultsWaitPage4 is skipped, since the next StartRoundWaitPage
+#               (or the next block's) already waits for all groups before
+#               anyone is regrouped.
+def merge_barriers(player) -> bool:
+    return bool(player.session.config.get('merge_barriers', False))
@@ -0,0 +1,40 @@
+from sqlalchemy import bindparam
+from sqlalchemy.orm.attributes import set_committed_value
+
+from otree.database import db
+
+from .snapshot import SNAPSHOT_KEY
+
+
+def bulk_update(rows):
+    """
+    rows: [(instance, {field: value, ...}), ...] – instances of one model,
+    every dict with the same fields.
+
+    Writes the whole list as one executemany UPDATE instead of letting the
+    ORM flush each dirty row, then refreshes the loaded instances without
+    marking them dirty so nothing is written twice.
+    """
+    if not rows:
+        return
+    table = type(rows[0][0]).__table__
+    fields = list(rows[0][1])
+    stmt = (
+        table.update()
+        .where(table.c.id == bindparam('_pk'))
+        .values({f: bindparam(f'_{f}') for f in fields})
+    )
+    params = [
+        {'_pk': obj.id, **{f'_{f}': values[f] for f in fields}}
+        for obj, values in rows
+    ]
+
+    session = db._db
+    # pending ORM changes (e.g. the regrouping) must reach the DB first
+    session.flush()
+    session.execute(stmt, params)
+    # the request's group snapshots may hold the old values
+    session.info.pop(SNAPSHOT_KEY, None)
+    for obj, values in rows:
+        for f, v in values.items():
+            set_committed_value(obj, f, v)
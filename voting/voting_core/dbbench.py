@@ -0,0 +1,115 @@
+"""
+SQLite default vs. the PostgreSQL profile (voting_core.dbprofile) for one lab room.
+
+For each backend a fresh `otree prodserver` plays one session per config
+with the room's participants (voting_core.loadtest), then reports
+
+    pages      render / submit / arrive / wait latency over all pages
+    barriers   after_all_players_arrive and the flush right after it,
+               from voting_core_barriertiming, per wait page
+
+    python -m voting_core.dbbench --postgres postgresql://bench@localhost/voting_bench
+    python -m voting_core.dbbench --postgres $DATABASE_URL --participants 30 --think 2
+
+The Postgres database must be a scratch one: its tables are dropped.
+Run from the project directory.  Needs requirements-dev.txt.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from .loadtest import THINK, launch_server, run
+
+KINDS = ['render', 'submit', 'arrive', 'wait']
+PERCENTILES = [50, 90, 99]
+
+
+def page_stats(timings) -> dict:
+    """kind → [n, p50, p90, p99] in ms, over every page"""
+    by_kind = defaultdict(list)
+    for (page, kind), xs in timings.samples.items():
+        by_kind[kind].extend(xs)
+    return {kind: [len(xs), *np.percentile(xs, PERCENTILES) * 1000]
+            for kind, xs in by_kind.items()}
+
+
+def barrier_stats(database_url: str) -> dict:
+    """'app/page' → [n, callback p50, p99, flush p50, p99] in ms"""
+    engine = create_engine(database_url)
+    rows = engine.execute(text(
+        'SELECT app, page, callback, flush FROM voting_core_barriertiming')).fetchall()
+    engine.dispose()
+    by_page = defaultdict(list)
+    for app, page, callback, flush in rows:
+        by_page[f'{app}/{page}'].append((callback, flush))
+    stats = {}
+    for page, xs in by_page.items():
+        callback, flush = (np.array(col) * 1000 for col in zip(*xs))
+        stats[page] = [len(xs), *np.percentile(callback, [50, 99]),
+                       *np.percentile(flush, [50, 99])]
+    return stats
+
+
+def bench(database_url, configs, participants: int, port: int, think: float,
+          seed) -> dict:
+    """one backend: database_url None = SQLite in a scratch copy of the project"""
+    with launch_server(port, database_url) as workdir:
+        t0 = time.perf_counter()
+        timings = run(f'http://127.0.0.1:{port}', configs, participants,
+                      os.environ.get('OTREE_REST_KEY', 'loadtest'), think=think, seed=seed)
+        elapsed = time.perf_counter() - t0
+        barriers = barrier_stats(database_url or f'sqlite:///{workdir}/db.sqlite3')
+    return dict(elapsed=elapsed, pages=page_stats(timings), barriers=barriers)
+
+
+def report(results: dict) -> str:
+    lines = [f"{'wall time':<60} {name:<9} {r['elapsed']:>8.1f} s"
+             for name, r in results.items()]
+    lines += ['', f"{'page kind':<60} {'backend':<9} {'n':>8} {'p50':>8} {'p90':>8} "
+                  f"{'p99':>8}   (ms)"]
+    for kind in KINDS:
+        for name, r in results.items():
+            if kind in r['pages']:
+                n, *ps = r['pages'][kind]
+                lines.append(f'{kind:<60} {name:<9} {n:>8} ' + ' '.join(f'{p:>8.1f}' for p in ps))
+    lines += ['', f"{'wait page':<60} {'backend':<9} {'n':>8} {'cb p50':>8} {'cb p99':>8} "
+                  f"{'fl p50':>8} {'fl p99':>8}   (ms)"]
+    for page in sorted({page for r in results.values() for page in r['barriers']}):
+        for name, r in results.items():
+            if page in r['barriers']:
+                n, *ps = r['barriers'][page]
+                lines.append(f'{page:<60} {name:<9} {n:>8} ' + ' '.join(f'{p:>8.1f}' for p in ps))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--postgres', help='scratch database URL (omit to time SQLite only)')
+    parser.add_argument('--configs', nargs='+', default=['Voting'])
+    parser.add_argument('--participants', type=int, default=30,
+                        help='seats in the room; a multiple of 3')
+    parser.add_argument('--think', type=float, default=THINK,
+                        help=f'max seconds a bot spends on a form page ({THINK})')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    backends = {'sqlite': None}
+    if args.postgres:
+        backends['postgres'] = args.postgres
+    results = {}
+    for name, url in backends.items():
+        print(f'{name}: {len(args.configs)} session(s) x {args.participants} participants',
+              file=sys.stderr)
+        results[name] = bench(url, args.configs, args.participants, args.port,
+                              args.think, args.seed)
+    print(report(results))
+
+
+if __name__ == '__main__':
+    main()
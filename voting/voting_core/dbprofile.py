@@ -0,0 +1,86 @@
+import os
+
+import sqlalchemy
+from sqlalchemy import create_engine, pool
+
+# ------------------------------------------------------------------
+#  PostgreSQL production profile
+# ------------------------------------------------------------------
+#   oTree builds one engine per process on a StaticPool: a single
+#   connection for the life of the server, never checked, so a Postgres
+#   restart or an idle-connection reaper takes the server down with it,
+#   and bulk_update's executemany goes out one statement per row.
+#   When DATABASE_URL points at Postgres, serve.py (the Procfile starts
+#   oTree through it) replaces the engine before any connection is made
+#   with one that has
+#     - a QueuePool that pings connections on checkout and recycles them
+#     - psycopg2's execute_batch / execute_values for executemany, so the
+#       per-player UPDATEs at a barrier are sent in pages, not row by row
+#   Everything is read from the environment; SQLite is left untouched.
+#
+#     VOTING_DB_POOL_SIZE           connections kept open              5
+#     VOTING_DB_MAX_OVERFLOW        extra connections under load       10
+#     VOTING_DB_POOL_RECYCLE        reconnect after this many s        1800
+#     VOTING_DB_BATCH_PAGE_SIZE     UPDATEs per round trip             500
+#     VOTING_DB_STATEMENT_TIMEOUT   ms, unset = none
+#     VOTING_DB_SYNCHRONOUS_COMMIT  'off' trades the last commits before
+#                                   a crash for commit latency
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name) or default)
+
+
+def is_postgres(url: str) -> bool:
+    return url.startswith(('postgres://', 'postgresql'))
+
+
+def engine_options() -> dict:
+    connect_args = dict(application_name='voting')
+    options = []
+    if _env_int('VOTING_DB_STATEMENT_TIMEOUT', 0):
+        options.append(f'-c statement_timeout={os.environ["VOTING_DB_STATEMENT_TIMEOUT"]}')
+    if os.environ.get('VOTING_DB_SYNCHRONOUS_COMMIT'):
+        options.append(f'-c synchronous_commit={os.environ["VOTING_DB_SYNCHRONOUS_COMMIT"]}')
+    if options:
+        connect_args['options'] = ' '.join(options)
+    return dict(
+        poolclass=pool.QueuePool,
+        pool_size=_env_int('VOTING_DB_POOL_SIZE', 5),
+        max_overflow=_env_int('VOTING_DB_MAX_OVERFLOW', 10),
+        pool_recycle=_env_int('VOTING_DB_POOL_RECYCLE', 1800),
+        pool_pre_ping=True,
+        connect_args=connect_args,
+        **executemany_options(_env_int('VOTING_DB_BATCH_PAGE_SIZE', 500)),
+    )
+
+
+def executemany_options(page_size: int, version: str = sqlalchemy.__version__) -> dict:
+    """
+    psycopg2 batching under the installed SQLAlchemy: 1.3 calls it 'values',
+    1.4 and 2.0 'values_plus_batch' (execute_batch for UPDATE either way);
+    2.0 drops executemany_values_page_size
+    """
+    major, minor = (int(x) for x in version.split('.')[:2])
+    if (major, minor) < (1, 4):
+        return dict(executemany_mode='values', executemany_batch_page_size=page_size,
+                    executemany_values_page_size=10000)
+    options = dict(executemany_mode='values_plus_batch', executemany_batch_page_size=page_size)
+    if major < 2:
+        options['executemany_values_page_size'] = 10000
+    return options
+
+
+def configure_engine():
+    """swap oTree's engine for the pooled, batched one; a no-op off Postgres"""
+    url = os.environ.get('DATABASE_URL', '')
+    if not is_postgres(url):
+        return
+    import otree.database
+
+    if isinstance(otree.database.engine.pool, pool.QueuePool):
+        return   # already configured in this process
+    # Heroku hands out postgres://, which SQLAlchemy 1.4+ no longer accepts
+    engine = create_engine(url.replace('postgres://', 'postgresql://', 1), **engine_options())
+    otree.database.engine = engine
+    otree.database.DBSession.configure(bind=engine)
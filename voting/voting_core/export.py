@@ -0,0 +1,190 @@
+"""
+One typed row per player-round, for analysis across many sessions.
+
+Each block app offers it as custom_export_rounds (CSV, from the Data
+page). Only oTree 6 lists custom_export_* hooks besides custom_export
+itself; on oTree 5 the Data page never shows it, and this command is the
+way to get the rows. It streams them out of the database as Parquet or
+Arrow IPC record batches, one session at a time, so memory stays bounded
+however many sessions are exported:
+
+    python -m voting_core.export --out exports
+    python -m voting_core.export --out exports --format arrow \\
+        --apps Voting_Block_Four_full_chat --sessions abcd1234 efgh5678
+
+Run it from the project directory with the server's DATABASE_URL; it
+needs pyarrow (pip install -r requirements-export.txt), the server does not.
+"""
+import argparse
+import importlib
+import os
+import sys
+
+from .network import DECISION_FIELDS, id_bit
+from .posterior import POSTERIORS, visible_pattern
+
+# ------------------------------------------------------------------
+#  Columns
+# ------------------------------------------------------------------
+#   (name, pyarrow type).  Treatment columns and the share / receive
+#   columns are null in Blocks One/Two; timings are ms since the page was
+#   requested (voting_core.timing.PAGE_EVENTS), null when not recorded.
+COLUMNS = [
+    ('session', 'string'), ('participant', 'string'), ('app', 'string'),
+    ('block', 'string'), ('direction', 'string'), ('sharing', 'string'),
+    ('round_number', 'int16'), ('group', 'int16'), ('id_in_group', 'int8'),
+    ('state', 'string'), ('signal', 'string'), ('quality', 'string'),
+    ('current_pattern', 'string'),
+    ('role_in_lottery', 'string'), ('decision', 'int8'),
+    ('knows_1', 'bool_'), ('knows_2', 'bool_'), ('knows_3', 'bool_'),
+    ('visible_pattern', 'string'), ('p_red', 'float64'), ('optimal_vote', 'string'),
+    ('vote', 'string'), ('correct', 'bool_'),
+    ('payoff_record', 'int16'), ('paid', 'bool_'),
+    ('decision_ms', 'int32'), ('decision_submit_ms', 'int32'),
+    ('vote_ms', 'int32'), ('vote_submit_ms', 'int32'), ('vote_hidden_ms', 'int32'),
+]
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+# page_log entry: [app, page, round, visible, first_input, decision, submit, hidden, accepted]
+DECISION_PAGE, VOTE_PAGE = 'Info_and_decision', 'network_and_voting'
+_DECISION, _SUBMIT, _HIDDEN = 5, 6, 7
+
+
+def _page_times(participant, app: str) -> dict:
+    """(page, round) → the accepted page_log entry of this app"""
+    return {(e[1], e[2]): e for e in participant.vars.get('page_log', [])
+            if e[0] == app and e[-1]}
+
+
+def round_rows(players, C):
+    """one tuple per played player-round, in COLUMNS order"""
+    app = C.__module__
+    shared = hasattr(C, 'DIRECTION')
+    field = DECISION_FIELDS[C.DIRECTION] if shared else None
+
+    groups, times, paid = {}, {}, {}
+    for p in players:
+        groups.setdefault(p.group_id, []).append(p)
+
+    for p in players:
+        if p.field_maybe_none('current_pattern') is None:
+            continue   # round not played yet
+        pp = p.participant
+        if pp.id not in times:
+            times[pp.id] = _page_times(pp, app)
+            paid[pp.id] = (pp.vars.get(app) or [None, None])[1]
+        others = [q for q in groups[p.group_id] if q.id_in_group != p.id_in_group]
+        pattern = visible_pattern(p, others, C)
+        post = POSTERIORS[pattern]
+        vote = p.field_maybe_none('vote')
+        state = p.group.field_maybe_none('state')
+        knows = ([bool(p.info_mask & id_bit(i)) for i in (1, 2, 3)] if shared
+                 else [None] * 3)
+        decide = times[pp.id].get((DECISION_PAGE, p.round_number)) or [None] * 9
+        voted = times[pp.id].get((VOTE_PAGE, p.round_number)) or [None] * 9
+        yield (
+            p.session.code, pp.code, app,
+            C.BLOCK, getattr(C, 'DIRECTION', None), getattr(C, 'SHARING', None),
+            p.round_number, p.group.id_in_subsession, p.id_in_group,
+            state, p.signals, p.qualities, p.current_pattern,
+            p.role_in_lottery if shared else None,
+            p.field_maybe_none(field) if shared else None,
+            *knows,
+            pattern, post.p_red, post.vote or None,
+            vote, None if vote is None else vote == state,
+            p.payoff_record, p.round_number == paid[pp.id],
+            decide[_DECISION], decide[_SUBMIT],
+            voted[_DECISION], voted[_SUBMIT], voted[_HIDDEN],
+        )
+
+
+def round_export(players, C):
+    """custom_export rows: COLUMN_NAMES, then round_rows"""
+    yield COLUMN_NAMES
+    yield from round_rows(players, C)
+
+
+# ------------------------------------------------------------------
+#  Streaming to Parquet / Arrow IPC
+# ------------------------------------------------------------------
+def session_rows(app: str, session_codes=None):
+    """round_rows of one app, one list per session, each read in its own DB session"""
+    from sqlalchemy.orm import joinedload
+
+    from otree.database import db, session_scope
+    from otree.models import Session
+
+    module = importlib.import_module(app)
+    Player = module.Player
+    with session_scope():
+        codes = session_codes or [code for (code,) in
+                                  db.query(Session.code).order_by(Session.id)]
+    for code in codes:
+        with session_scope():
+            session = db.query(Session).filter_by(code=code).one()
+            players = (db.query(Player).filter(Player.session_id == session.id)
+                       .options(joinedload(Player.participant), joinedload(Player.group))
+                       .order_by(Player.id).all())
+            if players:
+                yield list(round_rows(players, module.C))
+
+
+def write_stream(path: str, sessions, fmt: str = 'parquet', batch_rows: int = 65536) -> int:
+    """write lists of round_rows as record batches of up to batch_rows; returns the row count"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit('voting_core.export needs pyarrow: pip install -r requirements-export.txt')
+
+    schema = pa.schema([(name, getattr(pa, t)()) for name, t in COLUMNS])
+    writer = (pq.ParquetWriter(path, schema) if fmt == 'parquet'
+              else pa.ipc.new_file(path, schema))
+
+    def flush(rows):
+        columns = zip(*rows)
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(col, type=f.type) for col, f in zip(columns, schema)], schema=schema)
+        writer.write_batch(batch)
+
+    total, buffer = 0, []
+    try:
+        for rows in sessions:
+            buffer.extend(rows)
+            while len(buffer) >= batch_rows:
+                flush(buffer[:batch_rows])
+                buffer = buffer[batch_rows:]
+            total += len(rows)
+        if buffer:
+            flush(buffer)
+    finally:
+        writer.close()
+    return total
+
+
+def block_apps() -> list[str]:
+    from otree.settings import OTREE_APPS
+    return [app for app in OTREE_APPS if hasattr(importlib.import_module(app).C, 'BLOCK')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--out', default='exports', help='output directory')
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet')
+    parser.add_argument('--apps', nargs='+', help='block apps (default: all in settings)')
+    parser.add_argument('--sessions', nargs='+', help='session codes (default: all)')
+    parser.add_argument('--batch-rows', type=int, default=65536)
+    args = parser.parse_args(argv)
+
+    from otree.main import setup
+    setup()
+
+    os.makedirs(args.out, exist_ok=True)
+    for app in args.apps or block_apps():
+        path = os.path.join(args.out, f'{app}.{args.format}')
+        n = write_stream(path, session_rows(app, args.sessions), args.format, args.batch_rows)
+        print(f'{path}: {n} rows')
+
+
+if __name__ == '__main__':
+    main()
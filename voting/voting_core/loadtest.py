@@ -0,0 +1,507 @@
+"""
+Browser-less concurrent bots against a running oTree server.
+
+Every participant of a fresh session is played by its own thread over
+plain HTTP: form pages are filled from their rendered HTML, wait pages
+are left the way the browser leaves them, on the page's websocket
+notification (--wait socket, the default) or by polling until they
+redirect (--wait poll). Per page the harness reports latency
+percentiles of
+
+    render   GET of a form page
+    submit   POST of a form page
+    arrive   first GET of a wait page (the last arrival also runs
+             after_all_players_arrive)
+    poll     later GETs of a wait page
+    reload   GET of a wait page after its socket said it is ready
+    wait     arrival until release, i.e. what a participant sits through
+
+and, over the whole run, the request throughput, p99 / p99.9 per kind and
+the release lag of the all-groups wait pages: the last arrival's GET
+until each waiting participant is let through.
+
+Sessions are either bare (--participants per config) or opened in rooms
+whose participants join through the room URL with their label, the way
+a lab does: EssexLab with the labels in _rooms/, and a number N for a
+synthetic room of N labels. Configs alternate over the rooms, and every
+room seats a multiple of 3; labels beyond it are left out.
+
+    python -m voting_core.loadtest --launch --participants 30 --think 2
+    python -m voting_core.loadtest --server http://lab-host:8000 \\
+        --configs Voting Voting_receiver --participants 30
+    python -m voting_core.loadtest --launch --rooms EssexLab 60 120 300 --think 5
+
+Synthetic rooms are settings.ROOMS entries LoadTest1, LoadTest2, ...,
+which exist only when the server runs with VOTING_LOADTEST_ROOMS set to
+at least their number (--launch does this). The server's OTREE_REST_KEY
+must be passed in the environment when it runs in DEMO / STUDY mode.
+The harness needs requests and websockets: pip install -r requirements-dev.txt
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from html import unescape
+from urllib.parse import quote, urljoin, urlsplit
+
+import numpy as np
+import requests
+import websockets
+from urllib3.util.retry import Retry
+
+# ------------------------------------------------------------------
+#  Answers
+# ------------------------------------------------------------------
+# comprehension tests must be answered correctly to get past them
+QUIZ_SOLUTIONS = {
+    ('Voting_Block_One_individual_nochat', 'Comprehension_Test1'):
+        dict(quiz1=0, quiz2=0, quiz3=0, quiz4=1, quiz5=1),
+    ('Voting_Block_One_individual_nochat', 'Comprehension_Test2'):
+        dict(quiz7=2, quiz8=2, quiz9=0),
+    ('Voting_Block_One_individual_nochat', 'Comprehension_Test3'):
+        dict(quiz10=0, quiz11=2),
+    ('Voting_Block_Two_nochat', 'Comprehension_Test1'): dict(quiz1=1, quiz2=1),
+    ('Voting_Block_Three_partial_chat', 'Comprehension_Test'): dict(quiz1=1, quiz2=1),
+    ('Voting_Block_Three_partial_chat_receiver', 'Comprehension_Test'): dict(quiz1=1, quiz2=1),
+    ('Voting_Block_Four_full_chat', 'Comprehension_Test'): dict(quiz1=1, quiz2=1),
+    ('Voting_Block_Four_full_chat_receiver', 'Comprehension_Test'): dict(quiz1=1, quiz2=1),
+}
+TEXT_ANSWERS = {'Email_address': 'bot@example.com', 'Age': '21'}
+
+INPUT_TAG = re.compile(r'<(input|textarea|select)\b([^>]*)>', re.I)
+ATTR = re.compile(r'([\w-]+)\s*=\s*"([^"]*)"')
+OPTION = re.compile(r'<option[^>]*value="([^"]*)"', re.I)
+PAGE_URL = re.compile(r'/p/\w+/(\w+)/(\w+)/(\d+)')
+WAIT_SOCKET = re.compile(r'makeReconnectingWebSocket\("([^"]+)"\)')
+
+
+def form_fields(html: str) -> dict[str, list[str]]:
+    """field name → choices (empty list for free-form fields)"""
+    fields: dict[str, list[str]] = {}
+    for tag, attrs in INPUT_TAG.findall(html):
+        attrs = dict(ATTR.findall(attrs))
+        name = attrs.get('name')
+        kind = attrs.get('type', tag).lower()
+        if not name or kind in ('submit', 'button'):
+            continue
+        choices = fields.setdefault(name, [])
+        if kind in ('radio', 'checkbox'):
+            choices.append(attrs.get('value', 'on'))
+    for name in list(fields):
+        if not fields[name]:
+            sel = re.search(rf'<select[^>]*name="{name}"[^>]*>(.*?)</select>', html, re.S)
+            if sel:
+                fields[name] = [v for v in OPTION.findall(sel.group(1)) if v]
+    return fields
+
+
+def fill_form(app: str, page: str, html: str, rng: random.Random) -> dict:
+    data = {}
+    for name, choices in form_fields(html).items():
+        if choices:
+            data[name] = rng.choice(choices)
+        else:
+            data[name] = TEXT_ANSWERS.get(name, 'bot')
+    data.update(QUIZ_SOLUTIONS.get((app, page), {}))
+    return data
+
+
+# ------------------------------------------------------------------
+#  Timings
+# ------------------------------------------------------------------
+REQUEST_KINDS = ['render', 'submit', 'arrive', 'poll', 'reload']
+# default think time: with none the bots move in lockstep, every one of
+# them is counted as arrived before the first loads the wait page, and
+# nobody is ever held there
+THINK = 3.0
+# a saturated server answers late, but a request that gets no answer at
+# all must not hold its participant's thread forever
+REQUEST_TIMEOUT = 300
+# a keep-alive connection the server closes just as the bot reuses it is
+# reset; browsers silently resend, and oTree redirects a POST repeated
+# for a page the participant has already left
+RETRY = Retry(total=3, status=0, allowed_methods=None, backoff_factor=0.5)
+TAIL = [50, 99, 99.9]
+
+
+class Timings:
+    """
+    samples   (page, kind) → seconds
+    arrivals  (session, page_index) → when each participant's first GET
+              of that wait page started
+    releases  the same, for all-groups wait pages only: when each waiting
+              participant was told it may go on
+    """
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.arrivals = defaultdict(list)
+        self.releases = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def add(self, page: str, kind: str, seconds: float):
+        with self.lock:
+            self.samples[page, kind].append(seconds)
+
+    def arrive(self, barrier: tuple, at: float):
+        with self.lock:
+            self.arrivals[barrier].append(at)
+
+    def release(self, barrier: tuple, at: float):
+        with self.lock:
+            self.releases[barrier].append(at)
+
+    def waited(self) -> bool:
+        """whether anyone was ever held on a wait page"""
+        return any(kind == 'wait' for _, kind in self.samples)
+
+    def release_lag(self) -> list[float]:
+        """
+        from the last arrival before each release: oTree counts a participant
+        as arrived once the page before is submitted, so the GET that lets
+        everyone through need not be the last GET of the page
+        """
+        return [at - max(t for t in self.arrivals[barrier] if t <= at)
+                for barrier, released in self.releases.items() for at in released]
+
+    def report(self) -> str:
+        lines = [f"{'page':<60} {'kind':<7} {'n':>6} {'p50':>8} {'p90':>8} "
+                 f"{'p99':>8} {'max':>8}   (ms)"]
+        for (page, kind), xs in sorted(self.samples.items()):
+            p50, p90, p99 = np.percentile(xs, [50, 90, 99]) * 1000
+            lines.append(f'{page:<60} {kind:<7} {len(xs):>6} {p50:>8.1f} {p90:>8.1f} '
+                         f'{p99:>8.1f} {max(xs) * 1000:>8.1f}')
+        return '\n'.join(lines)
+
+    def summary(self, elapsed: float) -> str:
+        """throughput over the run and tail latency per kind"""
+        by_kind = defaultdict(list)
+        for (page, kind), xs in self.samples.items():
+            by_kind[kind].extend(xs)
+        by_kind['release lag'] = self.release_lag()
+        n = sum(len(by_kind[kind]) for kind in REQUEST_KINDS)
+        lines = [f'{n} requests in {elapsed:.1f}s = {n / elapsed:.1f} requests/s', '',
+                 f"{'kind':<12} {'n':>7} {'p50':>9} {'p99':>9} {'p99.9':>9} {'max':>9}   (ms)"]
+        for kind in REQUEST_KINDS + ['wait', 'release lag']:
+            xs = by_kind[kind]
+            if xs:
+                ps = np.percentile(xs, TAIL) * 1000
+                lines.append(f'{kind:<12} {len(xs):>7} ' + ' '.join(f'{p:>9.1f}' for p in ps)
+                             + f' {max(xs) * 1000:>9.1f}')
+        return '\n'.join(lines)
+
+
+# ------------------------------------------------------------------
+#  One participant
+# ------------------------------------------------------------------
+def await_ready(socket_url: str, timeout: float, stop: threading.Event) -> bool:
+    """
+    what the wait page's script does: block until the server says 'ready'
+    (True); False when stop is set or nothing comes within timeout seconds
+    """
+    async def listen():
+        deadline = time.monotonic() + timeout
+        async with websockets.connect(socket_url, open_timeout=timeout) as ws:
+            while time.monotonic() < deadline and not stop.is_set():
+                try:
+                    message = await asyncio.wait_for(ws.recv(), 1)
+                except asyncio.TimeoutError:
+                    continue
+                if json.loads(message).get('status') == 'ready':
+                    return True
+        return False
+
+    return asyncio.run(listen())
+
+
+def play_participant(server: str, start: str, timings: Timings, poll: float = 0.2,
+                     think: float = THINK, seed=None, max_form_errors: int = 3,
+                     session: str = '', sockets: bool = False, wait_timeout: float = 1800,
+                     stop: threading.Event = None):
+    """
+    start: the participant's first URL (its start link or a room link)
+    think: up to this many seconds on each form page before submitting
+    sockets: leave wait pages on their websocket notification, not by polling
+    wait_timeout: give up on a wait page nobody releases for this long
+    stop: set when another participant failed; return at the next page
+    """
+    stop = stop or threading.Event()
+    rng = random.Random(seed)
+    http = requests.Session()
+    for scheme in ('http://', 'https://'):
+        http.mount(scheme, requests.adapters.HTTPAdapter(max_retries=RETRY))
+    socket_root = 'ws' + server[len('http'):]
+
+    def timed(method, url, label, kind, **kw):
+        t0 = time.perf_counter()
+        resp = http.request(method, url, allow_redirects=False, timeout=REQUEST_TIMEOUT, **kw)
+        timings.add(label, kind, time.perf_counter() - t0)
+        return resp
+
+    url = urljoin(server, start)
+    resp = timed('GET', url, start.split('/')[1], 'render')
+    form_errors = 0
+    while not stop.is_set():
+        if resp.is_redirect:
+            url = urljoin(url, resp.headers['location'])
+            if 'OutOfRangeNotification' in url:
+                return
+            m = PAGE_URL.search(url)
+            label = f'{m.group(1)}/{m.group(2)}' if m else urlsplit(url).path.split('/')[1]
+            kind = 'arrive' if 'WaitPage' in label else 'render'
+            if m and kind == 'arrive':
+                timings.arrive((session, m.group(3)), time.perf_counter())
+            resp = timed('GET', url, label, kind)
+            continue
+        resp.raise_for_status()
+        m = PAGE_URL.search(url)
+        app, page, index = m.groups()
+        label = f'{app}/{page}'
+
+        if 'otree-wait-page' in resp.text:
+            arrived = time.perf_counter()
+            socket = WAIT_SOCKET.search(resp.text)
+            path = unescape(socket.group(1)) if socket else ''
+            while not resp.is_redirect:
+                left = wait_timeout - (time.perf_counter() - arrived)
+                if sockets and path:
+                    ready = left > 0 and await_ready(socket_root + path, left, stop)
+                    kind = 'reload'
+                else:
+                    ready = left > 0 and not stop.wait(poll)
+                    kind = 'poll'
+                if stop.is_set():
+                    return
+                if not ready:
+                    raise RuntimeError(f'{label} not released within {wait_timeout:.0f}s')
+                released = time.perf_counter()
+                resp = timed('GET', url, label, kind)
+                resp.raise_for_status()
+            if path.startswith('/subsession_wait_page'):
+                timings.release((session, index), released)
+            timings.add(label, 'wait', time.perf_counter() - arrived)
+            continue
+
+        dwell = rng.uniform(0, think)
+        if stop.wait(dwell):
+            return
+        data = fill_form(app, page, resp.text, rng)
+        # what page_timing.js would post, so the server does the same work
+        submit = int(dwell * 1000) + 50
+        data['page_events'] = f'50,{submit // 2},{submit - 10},{submit},0'
+        resp = timed('POST', url, label, 'submit', data=data)
+        if resp.is_redirect:
+            form_errors = 0
+        else:
+            form_errors += 1   # on this page
+            if form_errors > max_form_errors:
+                raise RuntimeError(f'{label} keeps rejecting the bot answers')
+
+
+# ------------------------------------------------------------------
+#  Sessions and rooms
+# ------------------------------------------------------------------
+def create_session(server: str, config: str, participants: int, rest_key: str = None,
+                   room: str = None) -> tuple[str, list[str]]:
+    """session code and participant codes; with room, the room's current session"""
+    headers = {'otree-rest-key': rest_key} if rest_key else {}
+    params = dict(session_config_name=config, num_participants=participants)
+    if room:
+        params['room_name'] = room
+    resp = requests.post(urljoin(server, '/api/sessions'), headers=headers, json=params)
+    resp.raise_for_status()
+    code = resp.json()['code']
+    resp = requests.get(urljoin(server, f'/api/sessions/{code}'), headers=headers)
+    resp.raise_for_status()
+    return code, [p['code'] for p in resp.json()['participants']]
+
+
+def room_labels(room: str) -> list[str]:
+    """labels from the room's participant_label_file in settings.ROOMS"""
+    import settings
+
+    (spec,) = [r for r in settings.ROOMS if r['name'] == room]
+    with open(os.path.join('_rooms', spec['participant_label_file'])) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def resolve_rooms(specs) -> list[tuple[str, list[str]]]:
+    """
+    'EssexLab' → its own labels, '60' → the next LoadTest room with labels
+    lt60_001 … lt60_060; each cut to a multiple of 3
+    """
+    rooms, synthetic = [], 0
+    for spec in specs:
+        if spec.isdigit():
+            synthetic += 1
+            name, labels = f'LoadTest{synthetic}', [f'lt{spec}_{i:03d}'
+                                                     for i in range(1, int(spec) + 1)]
+        else:
+            name, labels = spec, room_labels(spec)
+        rooms.append((name, labels[:len(labels) // 3 * 3]))
+    return rooms
+
+
+def run(server: str, configs, participants: int, rest_key: str = None,
+        poll: float = 0.2, think: float = THINK, seed=None, rooms=None,
+        sockets: bool = False) -> Timings:
+    """
+    one session per config, or per room (configs taking turns), all
+    participants of all sessions at once; rooms as from resolve_rooms
+    """
+    starts = []
+    if rooms:
+        for i, (room, labels) in enumerate(rooms):
+            code, _ = create_session(server, configs[i % len(configs)], len(labels),
+                                     rest_key, room)
+            starts += [(code, f'/room/{room}?participant_label={quote(label)}&welcome_page_ok=1')
+                       for label in labels]
+    else:
+        for config in configs:
+            code, participant_codes = create_session(server, config, participants, rest_key)
+            starts += [(code, f'/InitializeParticipant/{p}') for p in participant_codes]
+    timings = Timings()
+    seeds = random.Random(seed)
+    # the first failure stops everyone: the rest would only wait for a
+    # participant who will never arrive
+    stop, failures = threading.Event(), []
+    with ThreadPoolExecutor(len(starts)) as pool:
+        futures = {pool.submit(play_participant, server, start, timings, poll, think,
+                               seeds.random(), session=code, sockets=sockets, stop=stop): start
+                   for code, start in starts}
+        for f in as_completed(futures):
+            if f.exception():
+                failures.append(f'{futures[f]}: {f.exception()!r}')
+                print(failures[-1], file=sys.stderr)
+                stop.set()
+    if failures:
+        raise RuntimeError(f'{len(failures)} of {len(starts)} participants failed, '
+                           f'first {failures[0]}')
+    return timings
+
+
+@contextmanager
+def launch_server(port: int, database_url: str = None, rooms: int = 0):
+    """
+    `otree prodserver`, through serve.py, on a throw-away database: SQLite
+    in a scratch copy of the project (oTree always opens ./db.sqlite3), or
+    database_url, whose tables are dropped and recreated first; rooms: how many
+    synthetic LoadTest rooms it offers. Yields the scratch copy (None for
+    database_url); on exit the server's whole process group is stopped
+    and the copy removed.
+    """
+    env = dict(os.environ, OTREE_PRODUCTION='1', OTREE_AUTH_LEVEL='',
+               OTREE_REST_KEY=os.environ.get('OTREE_REST_KEY', 'loadtest'),
+               VOTING_LOADTEST_ROOMS=str(rooms))
+    workdir = proc = None
+    # the server has its own session, so a SIGTERM to us would orphan it
+    on_term = signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    try:
+        if database_url:
+            env['DATABASE_URL'] = database_url
+            subprocess.run([sys.executable, 'serve.py', 'resetdb', '--noinput'], env=env,
+                           check=True, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        else:
+            env.pop('DATABASE_URL', None)
+            workdir = tempfile.mkdtemp()
+            shutil.copytree('.', workdir, dirs_exist_ok=True,
+                            ignore=shutil.ignore_patterns('db.sqlite3', '__pycache__', '.*'))
+        # its own process group, so the `otree timeoutsubprocess` workers go too
+        proc = subprocess.Popen([sys.executable, 'serve.py', 'prodserver', str(port)],
+                                env=env, cwd=workdir,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
+                                start_new_session=True)
+        for _ in range(120):
+            try:
+                requests.get(f'http://127.0.0.1:{port}/', timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.5)
+        else:
+            raise RuntimeError('oTree server did not come up')
+        yield workdir
+    finally:
+        if proc:
+            stop_server(proc)
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        signal.signal(signal.SIGTERM, on_term)
+
+
+def _exit_on_sigterm(signum, frame):
+    sys.exit(128 + signum)
+
+
+def stop_server(proc: subprocess.Popen, timeout: float = 10):
+    """SIGTERM the server's process group, then SIGKILL whatever outlived it"""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        pass
+    except ProcessLookupError:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    proc.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--server', default='http://127.0.0.1:8000')
+    parser.add_argument('--launch', action='store_true',
+                        help='start `otree prodserver` on a scratch database first')
+    parser.add_argument('--database-url',
+                        help='with --launch: this database instead of SQLite (tables are dropped)')
+    parser.add_argument('--configs', nargs='+', default=['Voting', 'Voting_receiver'])
+    parser.add_argument('--participants', type=int, default=30,
+                        help='per session; a multiple of 3')
+    parser.add_argument('--rooms', nargs='+',
+                        help='EssexLab and/or seat counts of synthetic rooms, '
+                             'one session each instead of --participants')
+    parser.add_argument('--wait', choices=['socket', 'poll'], default='socket',
+                        help='leave wait pages on their websocket message or by polling')
+    parser.add_argument('--poll', type=float, default=0.2, help='wait page poll interval (s)')
+    parser.add_argument('--think', type=float, default=THINK,
+                        help=f'max seconds a bot spends on a form page ({THINK})')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    rooms = resolve_rooms(args.rooms or [])
+    server = nullcontext()
+    if args.launch:
+        port = int(args.server.rsplit(':', 1)[1].strip('/'))
+        server = launch_server(port, args.database_url,
+                               rooms=sum(room.startswith('LoadTest') for room, _ in rooms))
+    with server:
+        t0 = time.perf_counter()
+        timings = run(args.server, args.configs, args.participants,
+                      os.environ.get('OTREE_REST_KEY', 'loadtest' if args.launch else None),
+                      args.poll, args.think, args.seed, rooms, args.wait == 'socket')
+        elapsed = time.perf_counter() - t0
+    print(timings.report())
+    print()
+    print(timings.summary(elapsed))
+    sessions = ([f'{room} ({len(labels)})' for room, labels in rooms] if rooms
+                else [f'{config} ({args.participants})' for config in args.configs])
+    print(f'\n{", ".join(sessions)} in {elapsed:.1f}s', file=sys.stderr)
+    if not timings.waited():
+        sys.exit('no participant was ever held on a wait page, so there is no wait '
+                 'or release lag to report: the bots ran in lockstep; raise --think')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import random
+
+from .seen import PATTERN_BITS
+
+
+# ------------------------------------------------------------------
+#  Players → pattern slots
+# ------------------------------------------------------------------
+#   Every group of a triplet round shows the same patterns, so a round is
+#   a transportation problem: each slot k is taken by N / len(patterns)
+#   players, and a player costs 1 in slot k if they have seen patterns[k].
+#   With 0/1 costs the optimum is a maximum b-matching over the "not seen
+#   yet" edges, found with augmenting paths (O(N²) for 3 slots); whoever
+#   is left unmatched fills the remaining places at random.
+def match_unseen(masks, patterns, rng=random) -> list[int]:
+    """
+    masks:    seen-pattern bitset of each player (voting_core.seen)
+    patterns: the round's pattern for each slot
+    returns   the slot of each player, as many of them unseen as possible
+    """
+    n_slots = len(patterns)
+    cap = len(masks) // n_slots
+    bits = [PATTERN_BITS[pat] for pat in patterns]
+    edges = [[k for k in rng.sample(range(n_slots), n_slots) if not mask & bits[k]]
+             for mask in masks]
+    holders: list[list[int]] = [[] for _ in range(n_slots)]
+    slot_of: list = [None] * len(masks)
+
+    def place(i, k):
+        if slot_of[i] is not None:
+            holders[slot_of[i]].remove(i)
+        slot_of[i] = k
+        holders[k].append(i)
+
+    def augment(i, visited) -> bool:
+        for k in edges[i]:
+            if k in visited:
+                continue
+            visited.add(k)
+            if len(holders[k]) < cap or any(augment(j, visited) for j in list(holders[k])):
+                place(i, k)
+                return True
+        return False
+
+    for i in rng.sample(range(len(masks)), len(masks)):
+        augment(i, set())
+
+    free = [k for k in range(n_slots) for _ in range(cap - len(holders[k]))]
+    rng.shuffle(free)
+    for i in range(len(masks)):
+        if slot_of[i] is None:
+            place(i, free.pop())
+    return slot_of
+
+
+def group_matrix(players, slots, n_slots, rng=random) -> list[list]:
+    """
+    players sharing a slot are shuffled and dealt into groups, so the
+    i-th player of every group (id_in_group i + 1) holds slot i
+    """
+    columns = [[p for p, s in zip(players, slots) if s == k] for k in range(n_slots)]
+    for column in columns:
+        rng.shuffle(column)
+    return [list(row) for row in zip(*columns)]
@@ -0,0 +1,120 @@
+from .bulk import bulk_update
+from .rng import stream
+from .snapshot import others_in_group
+
+
+# ------------------------------------------------------------------
+#  Share / receive treatments
+# ------------------------------------------------------------------
+#   C.DIRECTION  'send'    – players choose whom to share their source with
+#                'receive' – players choose whom to receive a source from
+#   C.SHARING    'partial' – one randomly drawn player's decision is executed
+#                'full'    – every decision is executed, 'all group members' allowed
+DECISION_FIELDS = {'send': 'send_decision', 'receive': 'reveal_decision'}
+ROLES           = {'send': 'sender', 'receive': 'receiver'}
+VERBS           = {'send': 'share with', 'receive': 'receive from'}
+
+
+# codes stored in send_decision / reveal_decision; labels are display only
+NOBODY, GOT_R, GOT_B, EVERYONE = 0, 1, 2, 3
+TARGET_SIGNALS = {GOT_R: 'r', GOT_B: 'b'}
+
+
+def decision_choices(player, C) -> list[list]:
+    """[[code, label], ...] in random order, the same order on every render"""
+    verb = VERBS[C.DIRECTION]
+    others = [m.signal for m in others_in_group(player)]
+    if others[0] == others[1]:
+        code, col = (GOT_R, 'R') if others[0] == 'r' else (GOT_B, 'B')
+        whom = ('one of group members'
+                if C.DIRECTION == 'send' and C.SHARING == 'full'
+                else 'a group member')
+        opts = [[code, f'{verb} {whom} who got {col}']]
+    else:
+        opts = [[GOT_R, f'{verb} a group member who got R'],
+                [GOT_B, f'{verb} a group member who got B']]
+    if C.SHARING == 'full':
+        opts.append([EVERYONE, f'{verb} all group members'])
+    opts.append([NOBODY, f'do not {verb} anyone'])
+    stream(player.session, C.BLOCK, player.round_number, 'choices',
+           player.id_in_subsession).shuffle(opts)
+    return opts
+
+
+# ------------------------------------------------------------------
+#  Info flow: one bit per group member, bit (id_in_group - 1)
+# ------------------------------------------------------------------
+def id_bit(id_in_group: int) -> int:
+    return 1 << (id_in_group - 1)
+
+
+def knows(player, id_in_group: int) -> bool:
+    """player sees the source quality of group member id_in_group"""
+    return bool(player.info_mask & id_bit(id_in_group))
+
+
+def mask_ids(mask: int, own_id: int) -> list[int]:
+    """0b101, own 3 → [3, 1] (own id first, then the others ascending)"""
+    others = [i for i in range(1, mask.bit_length() + 1)
+              if mask & id_bit(i) and i != own_id]
+    return [own_id] + others
+
+
+def resolve_info_flow(subsession, C):
+    """execute share/receive decisions → info_mask (+ info_from_whom / info_codes)"""
+    field = DECISION_FIELDS[C.DIRECTION]
+    role = ROLES[C.DIRECTION]
+    rows = []
+
+    # every player of the round in one query, bucketed by group
+    by_group = {}
+    for p in subsession.get_players():
+        by_group.setdefault(p.group_id, []).append(p)
+
+    for g in subsession.get_groups():
+        ps = sorted(by_group[g.id], key=lambda p: p.id_in_group)
+        rng = stream(subsession.session, C.BLOCK, subsession.round_number, 'info',
+                     g.id_in_subsession)
+
+        # everyone starts out knowing only their own source
+        masks = {p.id_in_group: id_bit(p.id_in_group) for p in ps}
+        roles = {p.id_in_group: role if C.SHARING == 'full' else 'none' for p in ps}
+
+        if C.SHARING == 'full':
+            deciders = ps
+        else:
+            chosen = rng.choice(ps)
+            roles[chosen.id_in_group] = role
+            deciders = [chosen]
+
+        for p in deciders:
+            decision = getattr(p, field)
+            if decision == NOBODY:
+                continue
+            if decision == EVERYONE:
+                partners = [x for x in ps if x != p]
+            else:
+                tgt = TARGET_SIGNALS[decision]
+                cand = [x for x in ps if x != p and x.signals == tgt]
+                partners = [rng.choice(cand)] if cand else []
+
+            for q in partners:
+                if C.DIRECTION == 'send':
+                    masks[q.id_in_group] |= id_bit(p.id_in_group)
+                else:
+                    masks[p.id_in_group] |= id_bit(q.id_in_group)
+
+        # id lists and Rh / Bl style codes for display and export
+        by_id = {p.id_in_group: p for p in ps}
+        for p in ps:
+            ids = mask_ids(masks[p.id_in_group], p.id_in_group)
+            codes = [f"{'R' if by_id[i].signals == 'r' else 'B'}{by_id[i].qualities}"
+                     for i in ids]
+            rows.append((p, dict(
+                role_in_lottery=roles[p.id_in_group],
+                info_mask=masks[p.id_in_group],
+                info_from_whom=','.join(map(str, ids)),
+                info_codes=','.join(codes),
+            )))
+
+    bulk_update(rows)
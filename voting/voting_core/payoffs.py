@@ -0,0 +1,24 @@
+from .bulk import bulk_update
+from .rng import stream
+
+
+def set_payoffs(group, C):
+    """C.GROUP_PAYOFF: everyone earns AMOUNT_CORRECT per correct vote in the group;
+    otherwise each player earns AMOUNT_CORRECT for their own correct vote"""
+    players = group.get_players()
+    if C.GROUP_PAYOFF:
+        correct = sum(1 for p in players if p.vote == group.state)
+        amounts = [correct * C.AMOUNT_CORRECT] * len(players)
+    else:
+        amounts = [C.AMOUNT_CORRECT if p.vote == group.state else 0 for p in players]
+    bulk_update([(p, dict(payoff_record=a)) for p, a in zip(players, amounts)])
+
+
+def pay_random_round(group, C, app_name: str):
+    """pay one randomly drawn round; the payment app reads participant.vars[app_name]"""
+    rng = stream(group.session, C.BLOCK, 'paid_round', group.id_in_subsession)
+    rnd = rng.randint(1, C.NUM_ROUNDS)
+    for p in group.get_players():
+        p.selected_round = rnd
+        p.payoff = p.in_round(rnd).payoff_record
+        p.participant.vars[app_name] = [int(p.payoff), rnd]
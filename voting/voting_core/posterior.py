@@ -0,0 +1,78 @@
+from types import MappingProxyType
+from typing import NamedTuple
+
+from .network import knows
+from .signal_table import ACCURACY_H, ACCURACY_L, P_STATE_RED, P_STRONG
+from .triplets import SLOT_PATTERNS
+
+
+# ------------------------------------------------------------------
+#  Closed-form posterior for every visible pattern
+# ------------------------------------------------------------------
+#   P(signal matches state) by quality; a bare 'r' / 'b' (unknown jar)
+#   is a strong source with probability P_STRONG
+ACCURACY = {'h': ACCURACY_H, 'l': ACCURACY_L,
+            '': P_STRONG * ACCURACY_H + (1 - P_STRONG) * ACCURACY_L}
+
+
+class Posterior(NamedTuple):
+    p_red: float
+    vote: str        # optimal vote 'R' / 'B', '' when both are equally likely
+
+
+def posterior_of(tags) -> Posterior:
+    """('rh', 'b', '') → P(RED | what these tags show) and the better guess"""
+    like_red, like_blue = P_STATE_RED, 1 - P_STATE_RED
+    for tag in tags:
+        if not tag:
+            continue
+        acc = ACCURACY[tag[1:]]
+        like_red *= acc if tag[0] == 'r' else 1 - acc
+        like_blue *= acc if tag[0] == 'b' else 1 - acc
+    p_red = like_red / (like_red + like_blue)
+    vote = '' if abs(p_red - 0.5) < 1e-12 else 'R' if p_red > 0.5 else 'B'
+    return Posterior(p_red, vote)
+
+
+# pattern ('rh+0b', as in current_pattern) → Posterior; every tag combination
+POSTERIORS = MappingProxyType({
+    pattern: posterior_of(tags) for tags, pattern in SLOT_PATTERNS.items()
+})
+
+
+def lookup(pattern: str) -> Posterior:
+    return POSTERIORS[pattern]
+
+
+# ------------------------------------------------------------------
+#  What a player actually sees when voting
+# ------------------------------------------------------------------
+def visible_pattern(player, others, C) -> str:
+    """
+    Blocks One/Two: current_pattern.  Blocks Three/Four: every colour,
+    plus the qualities the info mask lets the player see.
+    """
+    if not hasattr(C, 'DIRECTION'):
+        return player.current_pattern
+    a, b = (q.signals + (q.qualities if knows(player, q.id_in_group) else '')
+            for q in others)
+    return SLOT_PATTERNS[player.signals + player.qualities, a, b]
+
+
+def posterior_export(players, C):
+    """custom_export rows: the pattern each voter saw, its posterior and the optimal vote"""
+    yield ['session', 'participant', 'round_number', 'id_in_group',
+           'visible_pattern', 'p_red', 'optimal_vote', 'vote']
+
+    groups = {}
+    for p in players:
+        groups.setdefault(p.group_id, []).append(p)
+
+    for p in players:
+        if p.field_maybe_none('current_pattern') is None:
+            continue   # round not played yet
+        others = [q for q in groups[p.group_id] if q.id_in_group != p.id_in_group]
+        pattern = visible_pattern(p, others, C)
+        post = POSTERIORS[pattern]
+        yield [p.session.code, p.participant.code, p.round_number, p.id_in_group,
+               pattern, round(post.p_red, 6), post.vote, p.field_maybe_none('vote')]
@@ -0,0 +1,16 @@
+MAX_ATTEMPTS = 100
+
+
+def quiz_errors(player, values, solutions, attempts_field, flag_field):
+    """
+    error_message helper for the comprehension tests: counts failed
+    attempts and lets the player through after MAX_ATTEMPTS
+    """
+    errors = {name: 'Wrong' for name in solutions if values[name] != solutions[name]}
+    if errors:
+        attempts = getattr(player, attempts_field) + 1
+        setattr(player, attempts_field, attempts)
+        if attempts >= MAX_ATTEMPTS:
+            setattr(player, flag_field, True)
+        else:
+            return errors
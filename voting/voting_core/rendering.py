@@ -0,0 +1,59 @@
+from types import MappingProxyType
+
+from .network import knows
+from .snapshot import group_snapshot, others_in_group
+
+# ------------------------------------------------------------------
+#  Signal-dot and source-label fragments
+# ------------------------------------------------------------------
+#   Only a handful of (signal, quality, visible) combinations exist, so
+#   every fragment is built once here and the templates pick it up by
+#   key: `dot` is a CSS class from _static/global/signals.css ('' when
+#   the signal is hidden), `label` the source label ('' when unknown).
+QUALITY_LABELS = {'h': 'strong source', 'l': 'weak source'}
+COLOURS        = {'r': 'red', 'b': 'blue'}
+
+FRAGMENTS = MappingProxyType({
+    (signal, quality, visible): MappingProxyType(dict(
+        dot=f'dot-{signal}' if signal in COLOURS else '',
+        label=QUALITY_LABELS.get(quality, '') if visible else '',
+    ))
+    for signal in ('', *COLOURS)
+    for quality in ('', *QUALITY_LABELS)
+    for visible in (True, False)
+})
+
+
+def fragment(member, visible: bool = True) -> dict:
+    """member: a voting_core.snapshot.Member"""
+    return dict(FRAGMENTS[member.signal, member.quality, visible], id=member.id_in_group)
+
+
+# ------------------------------------------------------------------
+#  vars_for_template builders
+# ------------------------------------------------------------------
+def private_info_vars(player) -> dict:
+    """Blocks One/Two: own signal plus whatever the others' tags reveal"""
+    me, others = _split(player)
+    return dict(me=fragment(me), other_urns=[fragment(m) for m in others])
+
+
+def decision_info_vars(player) -> dict:
+    """Blocks Three/Four, before the share/receive decision"""
+    me, others = _split(player)
+    return dict(me=fragment(me),
+                other_urns=[fragment(m, knows(player, m.id_in_group)) for m in others])
+
+
+def network_vars(player) -> dict:
+    """Blocks Three/Four, after the share/receive decisions are executed"""
+    me, others = _split(player)
+    rows = [dict(fragment(m, knows(player, m.id_in_group)), is_self=m is me)
+            for m in [me] + others]
+    return dict(participants_info=rows)
+
+
+def _split(player):
+    """(own Member, the others' Members) from the request's group snapshot"""
+    me = group_snapshot(player)[player.id_in_group - 1]
+    return me, others_in_group(player)
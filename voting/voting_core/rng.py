@@ -0,0 +1,26 @@
+import hashlib
+import random
+
+
+# ------------------------------------------------------------------
+#  Seeded random streams
+# ------------------------------------------------------------------
+#   One seed per session: session.config['rng_seed'], or else the
+#   session code.  Neither lives in session.vars, so a draw never marks
+#   the pickled vars (every schedule) dirty and rewrites the session row.
+#   Every draw comes from a stream named by a path such as
+#   ('two', 5, 'info', 3): the stream's seed is a hash of the session
+#   seed and the path, so streams are independent of each other, of the
+#   order in which they are used and of the process that uses them.
+#   Creating a session with the same rng_seed replays it.
+def session_seed(session) -> str:
+    return str(session.config.get('rng_seed') or session.code)
+
+
+def stream_seed(session, *path) -> int:
+    key = ':'.join(map(str, (session_seed(session),) + path))
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'big')
+
+
+def stream(session, *path) -> random.Random:
+    return random.Random(stream_seed(session, *path))
@@ -0,0 +1,78 @@
+import random
+from array import array
+
+import numpy as np
+
+from .signal_table import SignalTable, r, l
+
+
+class RecordsExhausted(Exception):
+    pass
+
+
+# ------------------------------------------------------------------
+#  Unused-record sampler
+# ------------------------------------------------------------------
+class RecordSampler:
+    """
+    hands out record ids in a pre-shuffled order, each one exactly once;
+    state is just the id order and a cursor into it
+    """
+    __slots__ = ('order', 'cursor')
+
+    def __init__(self, ids, seed=None):
+        order = np.random.default_rng(seed).permutation(np.asarray(ids))
+        typecode = 'H' if order.max(initial=0) < 1 << 16 else 'I'
+        self.order = array(typecode, order.tolist())
+        self.cursor = 0
+
+    def remaining(self) -> int:
+        return len(self.order) - self.cursor
+
+    def draw(self) -> int:
+        if self.cursor >= len(self.order):
+            raise RecordsExhausted(
+                f'signal table exhausted: all {len(self.order)} records used'
+            )
+        idx = self.order[self.cursor]
+        self.cursor += 1
+        return idx
+
+
+# ------------------------------------------------------------------
+#  Records grouped by triplet signature
+# ------------------------------------------------------------------
+# slot code 0..3 sorts the same way as the tags themselves
+SLOT_TAGS = ('bh', 'bl', 'rh', 'rl')
+
+
+def build_signature_index(table: SignalTable, seed=None) -> dict[str, RecordSampler]:
+    """one RecordSampler per tag signature"""
+    rng = np.random.default_rng(seed)
+    codes = np.sort(2 * (table.signals == r) + (table.qualities == l), axis=1)
+    keys = (codes * 4 ** np.arange(codes.shape[1])[::-1]).sum(axis=1)
+
+    index = {}
+    for key in np.unique(keys):
+        slots = [(key // 4 ** k) % 4 for k in reversed(range(codes.shape[1]))]
+        index[''.join(SLOT_TAGS[c] for c in slots)] = RecordSampler(
+            np.flatnonzero(keys == key), rng
+        )
+    return index
+
+
+def pop_record(index: dict[str, RecordSampler], signature: str = None, rng=random) -> int:
+    """
+    take an unused record with the given signature; fall back to any
+    unused record when that pool is empty
+    """
+    pool = index.get(signature)
+    if pool and pool.remaining():
+        return pool.draw()
+    # pool sizes as weights keep the fallback uniform over unused records
+    sigs = [sig for sig, pool in index.items() if pool.remaining()]
+    if not sigs:
+        total = sum(len(pool.order) for pool in index.values())
+        raise RecordsExhausted(f'signal table exhausted: all {total} records used')
+    sig = rng.choices(sigs, weights=[index[s].remaining() for s in sigs])[0]
+    return index[sig].draw()
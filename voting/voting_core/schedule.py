@@ -0,0 +1,143 @@
+from array import array
+
+from .matching import group_matrix, match_unseen
+from .rng import session_seed, stream, stream_seed
+from .sampling import RecordSampler, build_signature_index, pop_record
+from .seen import PATTERN_BITS, SEEN_KEY
+from .signal_table import PackedSignalTable, build_signal_table
+from .triplets import TAGS, build_triple_order, expand_triplet, tag_signature
+
+TABLE_SIZE = 1000       # records at least; see table_size
+
+
+# ------------------------------------------------------------------
+#  Compact per-block schedule
+# ------------------------------------------------------------------
+class BlockSchedule:
+    """
+    every round of one block, decided before anyone arrives; row-major
+    over (round, position), positions going group by group in
+    id_in_group order
+      members  array('H')  player id_in_subsession at each position
+      tags     bytearray   index into TAGS of the tag shown there
+      states   bytearray   b'R' / b'B' per (round, group)
+    """
+    __slots__ = ('num_players', 'members', 'tags', 'states')
+
+    def __init__(self, num_players: int):
+        self.num_players = num_players
+        self.members = array('H')
+        self.tags = bytearray()
+        self.states = bytearray()
+
+    @property
+    def num_groups(self) -> int:
+        return self.num_players // 3
+
+    def add_round(self, groups, tags, states):
+        """groups: [[id, id, id], ...], tags: [[tag, tag, tag], ...], states: 'R'/'B' per group"""
+        self.members.extend(pid for g in groups for pid in g)
+        self.tags.extend(TAGS.index(tag) for g in tags for tag in g)
+        self.states.extend(''.join(states).encode())
+
+    def matrix(self, round_number: int) -> list[list[int]]:
+        start = (round_number - 1) * self.num_players
+        ids = self.members[start:start + self.num_players]
+        return [list(ids[i:i + 3]) for i in range(0, self.num_players, 3)]
+
+    def group_tags(self, round_number: int) -> list[tuple[str, str, str]]:
+        start = (round_number - 1) * self.num_players
+        codes = self.tags[start:start + self.num_players]
+        return [tuple(TAGS[c] for c in codes[i:i + 3]) for i in range(0, self.num_players, 3)]
+
+    def group_states(self, round_number: int) -> str:
+        start = (round_number - 1) * self.num_groups
+        return self.states[start:start + self.num_groups].decode()
+
+
+def schedule_key(C) -> str:
+    return f'schedule_{C.BLOCK}'
+
+
+def table_size(num_players: int, C) -> int:
+    """
+    records to draw for one block: every group of every round takes one,
+    twice that leaves the signature pools of Blocks Three/Four room to
+    match without falling back
+    """
+    draws = num_players // C.PLAYERS_PER_GROUP * C.NUM_ROUNDS
+    return max(TABLE_SIZE, 2 * draws)
+
+
+# ------------------------------------------------------------------
+#  Building it
+# ------------------------------------------------------------------
+def init_schedule(session, C):
+    """
+    creating_session: draw the whole block up front, every draw from the
+    session's seeded streams (voting_core.rng). Triplet blocks carry every
+    participant's seen-pattern bitset over into the next block
+    (session.vars['seen_patterns']), so grouping there stays matched.
+    """
+    sv = session.vars
+    num_players = session.num_participants
+    raw = build_signal_table(table_size(num_players, C), seed=stream_seed(session, C.BLOCK, 'table'))
+    table = PackedSignalTable(raw.pack())
+    order = build_triple_order(C.TRIPLE_SECTIONS, C.ROWS_FIRST,
+                               stream(session, C.BLOCK, 'order'))
+    schedule = BlockSchedule(num_players)
+
+    if C.TAGS_FROM_RECORD:
+        record_index = build_signature_index(raw, seed=stream_seed(session, C.BLOCK, 'records'))
+        ids = list(range(1, num_players + 1))
+        for round_number, trip in enumerate(order[:C.NUM_ROUNDS], start=1):
+            # random groups; per group an unused record matching the triplet
+            rng = stream(session, C.BLOCK, round_number)
+            rng.shuffle(ids)
+            groups = [ids[i:i + 3] for i in range(0, num_players, 3)]
+            tags, states = [], []
+            for _ in groups:
+                idx = pop_record(record_index, tag_signature(trip), rng)
+                slots = table.tags_at(idx)
+                rng.shuffle(slots)
+                tags.append(slots)
+                states.append(table.state_at(idx))
+            schedule.add_round(groups, tags, states)
+    else:
+        sampler = RecordSampler(range(table.num_records),
+                                seed=stream_seed(session, C.BLOCK, 'records'))
+        seen = sv.get(SEEN_KEY) or [0] * num_players
+        ids = list(range(1, num_players + 1))
+        for round_number, trip in enumerate(order[:C.NUM_ROUNDS], start=1):
+            # every group shows the triplet; players are matched to slots
+            rng = stream(session, C.BLOCK, round_number)
+            patterns = expand_triplet(trip)
+            slots = match_unseen([seen[i - 1] for i in ids], patterns, rng)
+            groups = group_matrix(ids, slots, len(patterns), rng)
+            for g in groups:
+                for pid, pat in zip(g, patterns):
+                    seen[pid - 1] |= PATTERN_BITS[pat]
+            schedule.add_round(groups, [trip] * len(groups),
+                               [table.state_at(sampler.draw()) for _ in groups])
+        sv[SEEN_KEY] = seen
+
+    sv[schedule_key(C)] = schedule
+    return schedule
+
+
+# ------------------------------------------------------------------
+#  Admin report
+# ------------------------------------------------------------------
+def schedule_report_vars(subsession, C) -> dict:
+    """vars_for_admin_report: this round's groups, tags and states"""
+    schedule = subsession.session.vars.get(schedule_key(C))
+    if schedule is None:
+        return dict(schedule_rows=[], rng_seed=session_seed(subsession.session))
+    r = subsession.round_number
+    rows = [
+        dict(group=g, members=', '.join(map(str, ids)),
+             tags=' '.join(tag or '·' for tag in tags), state=state)
+        for g, (ids, tags, state) in enumerate(zip(
+            schedule.matrix(r), schedule.group_tags(r), schedule.group_states(r)), start=1)
+    ]
+    return dict(schedule_rows=rows, rng_seed=session_seed(subsession.session))
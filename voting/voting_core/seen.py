@@ -0,0 +1,26 @@
+from types import MappingProxyType
+
+from .triplets import SLOT_PATTERNS
+
+
+# ------------------------------------------------------------------
+#  Seen-pattern index
+# ------------------------------------------------------------------
+#   every pattern a slot can show gets one bit; what a participant has
+#   seen so far (across blocks, which draw from the same TRIPLE_ROWS) is a
+#   single int, so membership is one AND and the size does not grow with
+#   the number of rounds.
+PATTERN_BITS = MappingProxyType({
+    pattern: 1 << i for i, pattern in enumerate(sorted(set(SLOT_PATTERNS.values())))
+})
+
+# The bitsets live in session.vars[SEEN_KEY], a list indexed by
+# id_in_subsession - 1, not in participant.vars: init_schedule draws every
+# block at session creation, before anyone arrives, and hands the list on
+# from one triplet block to the next.
+SEEN_KEY = 'seen_patterns'
+
+
+def seen_patterns(mask: int) -> list[str]:
+    """bitset → patterns, for exports and debugging"""
+    return [pattern for pattern, bit in PATTERN_BITS.items() if mask & bit]
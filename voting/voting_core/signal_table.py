@@ -0,0 +1,100 @@
+import numpy as np
+from typing import NamedTuple
+
+
+# ------------------------------------------------------------------
+#  Signal model
+# ------------------------------------------------------------------
+SLOTS          = 3          # players per record
+P_STATE_RED    = 0.5        # prior on the RED box
+P_STRONG       = 0.30       # prior that a source is strong
+ACCURACY_H     = 8 / 9      # P(signal matches state | strong source)
+ACCURACY_L     = 5 / 9      # P(signal matches state | weak source)
+
+R, B = ord('R'), ord('B')
+r, b = ord('r'), ord('b')
+h, l = ord('h'), ord('l')
+
+
+class SignalTable(NamedTuple):
+    """
+    columnar signal table: one row per record, ASCII codes in uint8 columns
+      state      (M,)       b'R' / b'B'
+      qualities  (M, SLOTS) b'h' / b'l'
+      signals    (M, SLOTS) b'r' / b'b'
+    """
+    state: np.ndarray
+    qualities: np.ndarray
+    signals: np.ndarray
+
+    @property
+    def num_records(self) -> int:
+        return len(self.state)
+
+    def pack(self) -> bytes:
+        """
+        bit-packed blob for session.vars:
+          4-byte record count | state bits | quality bits | signal bits
+        (1 = R / h / r, row-major over (record, slot))
+        """
+        return (
+            self.num_records.to_bytes(4, 'big')
+            + np.packbits(self.state == R).tobytes()
+            + np.packbits(self.qualities == h).tobytes()
+            + np.packbits(self.signals == r).tobytes()
+        )
+
+
+class PackedSignalTable:
+    """read-only view over SignalTable.pack(); needs no numpy"""
+    __slots__ = ('_blob', 'num_records', '_state0', '_qual0', '_sig0')
+
+    def __init__(self, blob: bytes):
+        M = int.from_bytes(blob[:4], 'big')
+        self._blob = blob
+        self.num_records = M
+        # bit offsets of each column (columns start on a byte boundary)
+        self._state0 = 32
+        self._qual0 = self._state0 + 8 * ((M + 7) // 8)
+        self._sig0 = self._qual0 + 8 * ((M * SLOTS + 7) // 8)
+
+    def _bit(self, pos: int) -> int:
+        return (self._blob[pos >> 3] >> (7 - (pos & 7))) & 1
+
+    def state_at(self, idx: int) -> str:
+        return 'R' if self._bit(self._state0 + idx) else 'B'
+
+    def slots_at(self, idx: int) -> list[tuple[str, str]]:
+        """[(signal, quality), ...] for every slot of one record"""
+        base = idx * SLOTS
+        return [('r' if self._bit(self._sig0 + base + k) else 'b',
+                 'h' if self._bit(self._qual0 + base + k) else 'l')
+                for k in range(SLOTS)]
+
+    def tags_at(self, idx: int) -> list[str]:
+        """['rh', 'bl', ...] for every slot of one record"""
+        return [s + q for s, q in self.slots_at(idx)]
+
+
+def build_signal_table(
+    M: int = 1000,
+    seed=None,
+    slots: int = SLOTS,
+    p_strong: float = P_STRONG,
+    accuracy_h: float = ACCURACY_H,
+    accuracy_l: float = ACCURACY_L,
+) -> SignalTable:
+    """generate M data points in one batch"""
+    rng = np.random.default_rng(seed)
+
+    is_red = rng.random(M) < P_STATE_RED
+    strong = rng.random((M, slots)) < p_strong
+    # a source "hits" when its signal colour matches the state
+    hit = rng.random((M, slots)) < np.where(strong, accuracy_h, accuracy_l)
+    red_signal = hit == is_red[:, None]
+
+    return SignalTable(
+        state=np.where(is_red, R, B).astype(np.uint8),
+        qualities=np.where(strong, h, l).astype(np.uint8),
+        signals=np.where(red_signal, r, b).astype(np.uint8),
+    )
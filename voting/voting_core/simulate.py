@@ -0,0 +1,302 @@
+"""
+Headless Monte Carlo simulator for the voting blocks.
+
+Plays many groups at once with numpy, without a server, database or
+browser. Each block app's C supplies the treatment (schedule sections,
+whether tags come from a record, payoff rule, sharing/direction), so
+oTree must be installed: importing an app, like importing voting_core,
+loads otree.api. The signal model, triplet schedules, decision codes and
+payoff rules are those of the live engine.
+
+    python -m voting_core.simulate Voting_Block_Three_partial_chat \\
+        --groups 1000000 --vote bayesian --decision random --seed 1
+"""
+import argparse
+import importlib
+import random
+from typing import NamedTuple
+
+import numpy as np
+
+from .network import EVERYONE, GOT_B, GOT_R, NOBODY
+from .signal_table import ACCURACY_H, ACCURACY_L, P_STATE_RED, P_STRONG, SLOTS
+from .triplets import build_triple_order
+
+# ------------------------------------------------------------------
+#  Encoding
+# ------------------------------------------------------------------
+#   signal   +1 red, -1 blue, 0 not shown
+#   quality   1 strong, 0 weak, -1 not shown / unknown
+SIGNAL_CODES  = {'r': 1, 'b': -1, '': 0}
+QUALITY_CODES = {'h': 1, 'l': 0, '': -1}
+
+
+class SignalModel(NamedTuple):
+    """the parameters of build_signal_table"""
+    p_state_red: float = P_STATE_RED
+    p_strong: float = P_STRONG
+    accuracy_h: float = ACCURACY_H
+    accuracy_l: float = ACCURACY_L
+
+    @property
+    def prior_llr(self) -> float:
+        return float(np.log(self.p_state_red / (1 - self.p_state_red)))
+
+    def llr(self, qual):
+        """log-likelihood ratio of one red signal, by quality code (-1 = unknown jar)"""
+        unknown = self.p_strong * self.accuracy_h + (1 - self.p_strong) * self.accuracy_l
+        return np.select(
+            [qual == 1, qual == 0],
+            [np.log(self.accuracy_h / (1 - self.accuracy_h)),
+             np.log(self.accuracy_l / (1 - self.accuracy_l))],
+            np.log(unknown / (1 - unknown)),
+        )
+
+
+DEFAULT_MODEL = SignalModel()
+
+
+class SimulationResult(NamedTuple):
+    block: str
+    vote_rule: str
+    decision_rule: str
+    accuracy: np.ndarray       # (rounds,)  share of correct votes per round
+    round_payoff: np.ndarray   # (rounds,)  mean payoff_record per round
+    payment: np.ndarray        # (groups, SLOTS)  payoff of the paid round
+
+    @property
+    def expected_payment(self) -> float:
+        return float(self.payment.mean())
+
+    def summary(self) -> str:
+        return (f'{self.block:<6} vote={self.vote_rule:<11} '
+                f'decision={self.decision_rule:<8} groups={len(self.payment):>9,} '
+                f'accuracy={self.accuracy.mean():.4f} '
+                f'E[payment]={self.expected_payment:.4f} '
+                f'sd={self.payment.std():.4f}')
+
+
+# ------------------------------------------------------------------
+#  Rounds: tags and states
+# ------------------------------------------------------------------
+def round_quota(C) -> int:
+    """rounds the block's schedule can fill: one triple per round"""
+    return sum(q for _, _, q in C.TRIPLE_SECTIONS)
+
+
+def _schedules(C, n_schedules: int, rng: random.Random):
+    """(n_schedules, NUM_ROUNDS, SLOTS) signal and quality codes"""
+    quota = round_quota(C)
+    if C.NUM_ROUNDS > quota:
+        raise ValueError(f'NUM_ROUNDS={C.NUM_ROUNDS} but the schedule has only {quota} triples')
+    sig = np.empty((n_schedules, C.NUM_ROUNDS, SLOTS), np.int8)
+    qual = np.empty_like(sig)
+    for s in range(n_schedules):
+        order = build_triple_order(C.TRIPLE_SECTIONS, C.ROWS_FIRST, rng)
+        for rnd, trip in enumerate(order[:C.NUM_ROUNDS]):
+            sig[s, rnd] = [SIGNAL_CODES[tag[:1]] for tag in trip]
+            qual[s, rnd] = [QUALITY_CODES[tag[1:]] for tag in trip]
+    return sig, qual
+
+
+def _draw_state(C, sig, qual, model: SignalModel, rng: np.random.Generator):
+    """
+    True = RED box.  Tags from a record: the state is drawn from its
+    posterior given the group's signals (the limit of an unbounded signal
+    table); otherwise the state is independent of the shown tags, as in
+    the live assignment.
+    """
+    if not C.TAGS_FROM_RECORD:
+        return rng.random(len(sig)) < model.p_state_red
+    llr = model.prior_llr + (sig * model.llr(qual)).sum(axis=1)
+    return rng.random(len(sig)) < 1 / (1 + np.exp(-llr))
+
+
+# ------------------------------------------------------------------
+#  Share / receive decisions
+# ------------------------------------------------------------------
+def _others(i: int) -> tuple[int, int]:
+    return tuple(j for j in range(SLOTS) if j != i)
+
+
+def _available(C, sig):
+    """(groups, SLOTS, 4) availability of GOT_R, GOT_B, EVERYONE, NOBODY"""
+    avail = np.zeros(sig.shape + (4,), bool)
+    for i in range(SLOTS):
+        others = sig[:, list(_others(i))]
+        avail[:, i, GOT_R - 1] = (others == 1).any(axis=1)
+        avail[:, i, GOT_B - 1] = (others == -1).any(axis=1)
+    avail[..., 2] = C.SHARING == 'full'
+    avail[..., 3] = True
+    return avail
+
+
+OPTION_CODES = np.array([GOT_R, GOT_B, EVERYONE, NOBODY], np.int8)
+
+
+def decide_random(C, sig, rng):
+    """uniform over the options shown to the player"""
+    weights = np.where(_available(C, sig), rng.random(sig.shape + (4,)), -1)
+    return OPTION_CODES[weights.argmax(axis=-1)]
+
+
+def decide_nobody(C, sig, rng):
+    return np.full(sig.shape, NOBODY, np.int8)
+
+
+def decide_share(C, sig, rng):
+    """uniform over the options that share / receive something"""
+    avail = _available(C, sig)
+    avail[..., 3] = False
+    weights = np.where(avail, rng.random(sig.shape + (4,)), -1)
+    return OPTION_CODES[weights.argmax(axis=-1)]
+
+
+DECISION_RULES = {'random': decide_random, 'nobody': decide_nobody,
+                  'share': decide_share}
+
+
+def resolve_masks(C, sig, decisions, rng):
+    """vectorised resolve_info_flow → (groups, SLOTS) info masks"""
+    n = len(sig)
+    masks = np.broadcast_to(1 << np.arange(SLOTS, dtype=np.int8), sig.shape).copy()
+    if C.SHARING == 'full':
+        active = np.ones(sig.shape, bool)
+    else:
+        active = np.arange(SLOTS) == rng.integers(SLOTS, size=n)[:, None]
+
+    for i in range(SLOTS):
+        j, k = _others(i)
+        code = decisions[:, i]
+        act = active[:, i] & (code != NOBODY)
+        everyone = code == EVERYONE
+        tgt = np.where(code == GOT_R, 1, -1)
+        cj, ck = sig[:, j] == tgt, sig[:, k] == tgt
+        pick_j = rng.random(n) < 0.5
+        to_j = act & (everyone | (cj & (~ck | pick_j)))
+        to_k = act & (everyone | (ck & (~cj | ~pick_j)))
+        if C.DIRECTION == 'send':
+            masks[:, j] |= to_j.astype(np.int8) << i
+            masks[:, k] |= to_k.astype(np.int8) << i
+        else:
+            masks[:, i] |= (to_j.astype(np.int8) << j) | (to_k.astype(np.int8) << k)
+    return masks
+
+
+# ------------------------------------------------------------------
+#  Voting rules
+# ------------------------------------------------------------------
+#   seen_sig   (groups, SLOTS, SLOTS)  signal of source j as seen by player i
+#   seen_qual  (groups, SLOTS, SLOTS)  quality of source j as seen by player i
+#   model      SignalModel the voters believe in
+#   returns    (groups, SLOTS)         +1 RED / -1 BLUE
+def _break_ties(score, fallback, rng):
+    vote = np.sign(score)
+    tie = vote == 0
+    vote[tie] = fallback[tie]
+    tie = vote == 0
+    vote[tie] = rng.choice(np.array([1, -1]), size=int(tie.sum()))
+    return vote
+
+
+def vote_own_signal(seen_sig, seen_qual, model, rng):
+    own = np.einsum('gii->gi', seen_sig).astype(float)
+    return _break_ties(own, np.zeros_like(own), rng)
+
+
+def vote_majority(seen_sig, seen_qual, model, rng):
+    own = np.einsum('gii->gi', seen_sig)
+    return _break_ties(seen_sig.sum(axis=-1).astype(float), own, rng)
+
+
+def vote_bayesian(seen_sig, seen_qual, model, rng):
+    llr = model.prior_llr + (seen_sig * model.llr(seen_qual)).sum(axis=-1)
+    return _break_ties(np.round(llr, 9), np.zeros(llr.shape), rng)
+
+
+VOTE_RULES = {'bayesian': vote_bayesian, 'majority': vote_majority,
+              'own_signal': vote_own_signal}
+
+
+# ------------------------------------------------------------------
+#  Block
+# ------------------------------------------------------------------
+def simulate_block(C, n_groups: int = 100_000, vote_rule: str = 'bayesian',
+                   decision_rule: str = 'random', n_schedules: int = 100,
+                   seed=None, model: SignalModel = DEFAULT_MODEL) -> SimulationResult:
+    """
+    n_groups groups play all C.NUM_ROUNDS rounds; group g follows triplet
+    schedule g % n_schedules (a session draws one schedule for all of
+    its groups)
+    """
+    rng = np.random.default_rng(seed)
+    py_rng = random.Random(int(rng.integers(1 << 32)))
+    vote = VOTE_RULES[vote_rule]
+    decide = DECISION_RULES[decision_rule]
+    has_network = hasattr(C, 'DIRECTION')
+
+    sched_sig, sched_qual = _schedules(C, n_schedules, py_rng)
+    which = np.arange(n_groups) % n_schedules
+
+    # pay_random_round: one round per group, drawn up front
+    paid = rng.integers(C.NUM_ROUNDS, size=n_groups)
+    payment = np.zeros((n_groups, SLOTS))
+    accuracy = np.empty(C.NUM_ROUNDS)
+    round_payoff = np.empty(C.NUM_ROUNDS)
+    for rnd in range(C.NUM_ROUNDS):
+        sig, qual = sched_sig[which, rnd], sched_qual[which, rnd]
+        state = _draw_state(C, sig, qual, model, rng)
+        if C.TAGS_FROM_RECORD:
+            # shuffled slots, like the records path of the live engine
+            perm = rng.permuted(np.broadcast_to(np.arange(SLOTS), sig.shape), axis=1)
+            sig = np.take_along_axis(sig, perm, axis=1)
+            qual = np.take_along_axis(qual, perm, axis=1)
+
+        seen_sig = np.broadcast_to(sig[:, None, :], (n_groups, SLOTS, SLOTS))
+        seen_qual = np.broadcast_to(qual[:, None, :], (n_groups, SLOTS, SLOTS))
+        if has_network:
+            # every colour is shown; a quality only where the mask has its bit
+            masks = resolve_masks(C, sig, decide(C, sig, rng), rng)
+            known = (masks[:, :, None] >> np.arange(SLOTS)) & 1
+            seen_qual = np.where(known == 1, seen_qual, -1)
+
+        correct = vote(seen_sig, seen_qual, model, rng) == np.where(state, 1, -1)[:, None]
+        accuracy[rnd] = correct.mean()
+        if C.GROUP_PAYOFF:
+            pay = np.repeat(correct.sum(axis=1, keepdims=True), SLOTS, axis=1)
+        else:
+            pay = correct.astype(float)
+        pay = pay * C.AMOUNT_CORRECT
+        round_payoff[rnd] = pay.mean()
+        payment[paid == rnd] = pay[paid == rnd]
+
+    return SimulationResult(C.BLOCK, vote_rule, decision_rule, accuracy,
+                            round_payoff, payment)
+
+
+def load_constants(app_name: str, **overrides):
+    """C of a block app, e.g. 'Voting_Block_Two_nochat', with some constants replaced"""
+    C = importlib.import_module(app_name).C
+    return type('C', (C,), overrides) if overrides else C
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('apps', nargs='+', help='block app names')
+    parser.add_argument('--groups', type=int, default=100_000)
+    parser.add_argument('--vote', choices=VOTE_RULES, nargs='+', default=['bayesian'])
+    parser.add_argument('--decision', choices=DECISION_RULES, default='random')
+    parser.add_argument('--schedules', type=int, default=100)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    for app in args.apps:
+        C = load_constants(app)
+        for rule in args.vote:
+            res = simulate_block(C, args.groups, rule, args.decision,
+                                 args.schedules, args.seed)
+            print(res.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+from collections import namedtuple
+
+from sqlalchemy import null
+
+from otree.database import db
+
+# ------------------------------------------------------------------
+#  Per-request group snapshot
+# ------------------------------------------------------------------
+#   oTree opens a fresh DB session for every request, so session.info
+#   lives exactly one request: the first callback that needs the group
+#   reads it with one column query, every later one reuses the tuple.
+#   bulk_update() drops the snapshots, so a request that writes signals,
+#   votes or decisions through it never reads its own stale copy.
+SNAPSHOT_KEY = 'group_snapshots'
+
+# the share / receive field of voting_core.network.DECISION_FIELDS
+DECISION_COLUMNS = ('send_decision', 'reveal_decision')
+
+Member = namedtuple('Member', ['id_in_group', 'signal', 'quality', 'vote', 'decision'])
+
+
+def group_snapshot(player) -> tuple:
+    """player's group as Member tuples, ordered by id_in_group"""
+    Player = type(player)
+    cache = db._db.info.setdefault(SNAPSHOT_KEY, {})
+    key = (Player.__table__.name, player.group_id)
+    if key not in cache:
+        columns = Player.__table__.c
+        decision = next((columns[f] for f in DECISION_COLUMNS if f in columns), null())
+        rows = (db.query(columns.id_in_group, columns.signals, columns.qualities,
+                         columns.vote, decision)
+                .filter(columns.group_id == player.group_id)
+                .order_by(columns.id_in_group))
+        cache[key] = tuple(Member(*row) for row in rows)
+    return cache[key]
+
+
+def others_in_group(player) -> list:
+    return [m for m in group_snapshot(player) if m.id_in_group != player.id_in_group]
@@ -0,0 +1,159 @@
+"""
+Parameter sweeps over the headless simulator, sharded across a process pool.
+
+    python -m voting_core.sweep Voting_Block_Four_full_chat \\
+        --grid AMOUNT_CORRECT=1,2 p_strong=0.3,0.5 SHARING=partial,full \\
+        --groups 1000000 --workers 8 --out sweep.csv
+
+Grid keys are either constants of the block app's C (AMOUNT_CORRECT,
+NUM_ROUNDS, SHARING, DIRECTION, ...) or fields of SignalModel
+(p_strong, accuracy_h, accuracy_l, p_state_red).
+"""
+import argparse
+import csv
+import difflib
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from .signal_table import SLOTS
+from .simulate import (
+    DECISION_RULES, VOTE_RULES, SignalModel, load_constants, round_quota, simulate_block,
+)
+
+SHARD_SIZE = 250_000
+
+
+class ShardStats(NamedTuple):
+    """sums that merge by addition"""
+    groups: int
+    correct: np.ndarray        # (rounds,) correct votes
+    round_payoff: np.ndarray   # (rounds,) summed payoff_record
+    payment: float
+    payment_sq: float
+
+    def __add__(self, other):
+        return ShardStats(*(a + b for a, b in zip(self, other)))
+
+
+def _run_shard(task) -> ShardStats:
+    app, constants, model, n_groups, vote_rule, decision_rule, seed = task
+    C = load_constants(app, **constants)
+    res = simulate_block(C, n_groups, vote_rule, decision_rule, seed=seed, model=model)
+    votes = n_groups * res.payment.shape[1]
+    return ShardStats(n_groups, res.accuracy * votes, res.round_payoff * votes,
+                      float(res.payment.sum()), float((res.payment ** 2).sum()))
+
+
+def expand_grid(grid: dict) -> list[tuple[dict, SignalModel]]:
+    """{'AMOUNT_CORRECT': [1, 2], 'p_strong': [.3]} → [(C overrides, model), ...]"""
+    points = []
+    for values in itertools.product(*grid.values()):
+        point = dict(zip(grid, values))
+        model = SignalModel(**{k: v for k, v in point.items() if k in SignalModel._fields})
+        constants = {k: v for k, v in point.items() if k not in SignalModel._fields}
+        points.append((constants, model))
+    return points
+
+
+def check_grid(app: str, points):
+    """
+    every grid key must name a constant of C or a SignalModel field, and
+    every grid point must fit the block's schedule; checked before any
+    work starts
+    """
+    C = load_constants(app)
+    known = [name for name in dir(C) if name.isupper()] + list(SignalModel._fields)
+    for key in sorted({key for constants, _ in points for key in constants}):
+        if not hasattr(C, key):
+            close = difflib.get_close_matches(key, known, n=1)
+            hint = f'; did you mean {close[0]}?' if close else ''
+            raise ValueError(f'{app}: grid key {key} is neither a constant of C '
+                             f'nor a SignalModel field{hint}')
+    for constants, _ in points:
+        C = load_constants(app, **constants)
+        quota = round_quota(C)
+        if C.NUM_ROUNDS > quota:
+            raise ValueError(f'{app}: NUM_ROUNDS={C.NUM_ROUNDS} at grid point {constants}, '
+                             f'but its schedule has only {quota} rounds')
+
+
+def sweep(app: str, grid: dict, n_groups: int = 1_000_000, vote_rule: str = 'bayesian',
+          decision_rule: str = 'random', workers: int = None,
+          shard_size: int = SHARD_SIZE, seed=None) -> list[dict]:
+    """one row of merged statistics per grid point"""
+    points = expand_grid(grid)
+    check_grid(app, points)
+    shards = [min(shard_size, n_groups - start) for start in range(0, n_groups, shard_size)]
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(points) * len(shards)))
+    tasks = [(app, constants, model, size, vote_rule, decision_rule, next(seeds))
+             for constants, model in points for size in shards]
+
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(_run_shard, tasks))
+
+    rows = []
+    for p, (constants, model) in enumerate(points):
+        stats = results[p * len(shards)]
+        for more in results[p * len(shards) + 1:(p + 1) * len(shards)]:
+            stats = stats + more
+        votes = stats.groups * SLOTS            # per round
+        rounds = len(stats.correct)
+        mean = stats.payment / votes
+        rows.append(dict(
+            app=app, **constants, **model._asdict(),
+            vote_rule=vote_rule, decision_rule=decision_rule, groups=stats.groups,
+            accuracy=float(stats.correct.sum() / (votes * rounds)),
+            mean_round_payoff=float(stats.round_payoff.sum() / (votes * rounds)),
+            expected_payment=mean,
+            sd_payment=float(np.sqrt(max(stats.payment_sq / votes - mean ** 2, 0))),
+        ))
+    return rows
+
+
+def _parse_value(text: str):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('app', help='block app name')
+    parser.add_argument('--grid', nargs='+', default=[], metavar='KEY=V1,V2,...')
+    parser.add_argument('--groups', type=int, default=1_000_000)
+    parser.add_argument('--vote', choices=VOTE_RULES, default='bayesian')
+    parser.add_argument('--decision', choices=DECISION_RULES, default='random')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--out', help='CSV file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    grid = {}
+    for item in args.grid:
+        key, _, values = item.partition('=')
+        grid[key] = [_parse_value(v) for v in values.split(',')]
+
+    try:
+        rows = sweep(args.app, grid, args.groups, args.vote, args.decision,
+                     args.workers, args.shard_size, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    out = open(args.out, 'w', newline='') if args.out else sys.stdout
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    if args.out:
+        out.close()
+
+
+if __name__ == '__main__':
+    main()
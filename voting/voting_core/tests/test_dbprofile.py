@@ -0,0 +1,76 @@
+"""
+The PostgreSQL profile against a real server. Needs a scratch database
+(its tables are dropped):
+
+    VOTING_TEST_DATABASE_URL=postgresql://bench@localhost/voting_test \\
+        python -m pytest voting_core/tests
+
+Run from the project directory.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, pool, text
+
+from voting_core.dbprofile import engine_options, executemany_options
+
+URL = os.environ.get('VOTING_TEST_DATABASE_URL')
+needs_postgres = pytest.mark.skipif(not URL, reason='VOTING_TEST_DATABASE_URL not set')
+
+
+def _python(code: str) -> str:
+    env = dict(os.environ, DATABASE_URL=URL)
+    return subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def test_executemany_options_follow_sqlalchemy_version():
+    assert executemany_options(500, '1.3.22')['executemany_mode'] == 'values'
+    assert executemany_options(500, '1.4.54')['executemany_mode'] == 'values_plus_batch'
+    assert 'executemany_values_page_size' not in executemany_options(500, '2.0.36')
+
+
+@needs_postgres
+def test_batched_updates(monkeypatch):
+    monkeypatch.setenv('VOTING_DB_BATCH_PAGE_SIZE', '100')
+    monkeypatch.setenv('VOTING_DB_STATEMENT_TIMEOUT', '5000')
+    engine = create_engine(URL, **engine_options())
+    try:
+        assert isinstance(engine.pool, pool.QueuePool)
+        assert engine.dialect.executemany_batch_page_size == 100
+        with engine.begin() as conn:
+            conn.execute(text('DROP TABLE IF EXISTS profile_check'))
+            conn.execute(text('CREATE TABLE profile_check (id int PRIMARY KEY, v int)'))
+            conn.execute(text('INSERT INTO profile_check SELECT g, 0 FROM generate_series(1, 1000) g'))
+            conn.execute(text('UPDATE profile_check SET v = :v WHERE id = :id'),
+                         [dict(id=i, v=i * 2) for i in range(1, 1001)])
+            total, = conn.execute(text('SELECT sum(v) FROM profile_check')).fetchone()
+            assert total == 1000 * 1001
+            timeout, = conn.execute(text('SHOW statement_timeout')).fetchone()
+            assert timeout == '5s'
+            conn.execute(text('DROP TABLE profile_check'))
+    finally:
+        engine.dispose()
+
+
+@needs_postgres
+def test_serve_swaps_the_engine_before_oTree_connects():
+    out = _python(
+        'import serve, otree.main\n'
+        'otree.main.setup = serve.setup\n'
+        'otree.main.setup()\n'
+        'import otree.database as d\n'
+        'from otree.models import Session\n'
+        'print(type(d.engine.pool).__name__, d.db.query(Session).count())\n'
+    )
+    pool_class, sessions = out.splitlines()[-1].split()
+    assert pool_class == 'QueuePool' and sessions.isdigit()
+
+
+@needs_postgres
+def test_importing_voting_core_leaves_the_engine_alone():
+    out = _python('import voting_core, otree.database as d\n'
+                  'print(type(d.engine.pool).__name__)\n')
+    assert out.splitlines()[-1] == 'StaticPool'
@@ -0,0 +1,45 @@
+"""
+write_stream round trip; skipped without pyarrow (requirements-export.txt).
+"""
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+from voting_core.export import COLUMN_NAMES, COLUMNS, write_stream  # noqa: E402
+
+_SAMPLE = {'string': 'red', 'int8': 1, 'int16': 2, 'int32': 1500,
+           'float64': 0.75, 'bool_': True}
+
+
+def _row(session: str, round_number: int) -> tuple:
+    row = dict((name, _SAMPLE[t]) for name, t in COLUMNS)
+    row.update(session=session, round_number=round_number,
+               direction=None, sharing=None, knows_2=None, vote_hidden_ms=None)
+    return tuple(row[name] for name in COLUMN_NAMES)
+
+
+def _read(path, fmt):
+    if fmt == 'parquet':
+        return pq.read_table(path)
+    with pa.ipc.open_file(path) as reader:
+        return reader.read_all()
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_write_stream_reads_back(tmp_path, fmt):
+    sessions = [[_row('s1', r) for r in range(1, 4)],
+                [_row('s2', r) for r in range(1, 3)]]
+    path = str(tmp_path / f'rounds.{fmt}')
+
+    assert write_stream(path, iter(sessions), fmt, batch_rows=2) == 5
+
+    table = _read(path, fmt)
+    assert table.schema.names == COLUMN_NAMES
+    assert [str(f.type) for f in table.schema] == [
+        str(getattr(pa, t)()) for _, t in COLUMNS]
+    rows = [tuple(r[name] for name in COLUMN_NAMES) for r in table.to_pylist()]
+    assert rows == sessions[0] + sessions[1]
+    if fmt == 'parquet':
+        assert pq.ParquetFile(path).num_row_groups == 3
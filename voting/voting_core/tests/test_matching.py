@@ -0,0 +1,80 @@
+"""
+match_unseen / group_matrix on hand-built and random seen-pattern masks.
+"""
+import random
+from collections import Counter
+from itertools import permutations
+
+from voting_core.matching import group_matrix, match_unseen
+from voting_core.seen import PATTERN_BITS
+from voting_core.triplets import ALL_TRIPLES, expand_triplet
+
+PATTERNS = expand_triplet(ALL_TRIPLES[0])       # three distinct patterns
+BITS = [PATTERN_BITS[p] for p in PATTERNS]
+SEEN_ALL = BITS[0] | BITS[1] | BITS[2]
+
+
+def _unseen(masks, slots) -> int:
+    return sum(not mask & BITS[k] for mask, k in zip(masks, slots))
+
+
+def _best_unseen(masks) -> int:
+    """brute force over every slot assignment that fills each slot equally"""
+    cap = len(masks) // len(PATTERNS)
+    base = [k for k in range(len(PATTERNS)) for _ in range(cap)]
+    return max(_unseen(masks, slots) for slots in set(permutations(base)))
+
+
+def test_every_player_placed_once_and_slots_filled_equally():
+    rng = random.Random(1)
+    masks = [rng.choice([0, BITS[0], BITS[1] | BITS[2], SEEN_ALL]) for _ in range(30)]
+    slots = match_unseen(masks, PATTERNS, rng)
+    assert len(slots) == 30
+    assert Counter(slots) == {0: 10, 1: 10, 2: 10}
+
+    players = list(range(1, 31))
+    groups = group_matrix(players, slots, len(PATTERNS), rng)
+    assert len(groups) == 10 and all(len(g) == 3 for g in groups)
+    assert sorted(p for g in groups for p in g) == players
+    for g in groups:
+        assert [slots[p - 1] for p in g] == [0, 1, 2]
+
+
+def test_only_unseen_slots_when_that_is_possible():
+    # each pair of players has exactly one unseen pattern left
+    masks = [BITS[1] | BITS[2]] * 2 + [BITS[0] | BITS[2]] * 2 + [BITS[0] | BITS[1]] * 2
+    for seed in range(20):
+        assert match_unseen(masks, PATTERNS, random.Random(seed)) == [0, 0, 1, 1, 2, 2]
+
+
+def test_matches_the_brute_force_optimum():
+    # greedy placement gets some of these wrong; augmenting paths must not
+    choices = [0, BITS[0], BITS[1], BITS[2], BITS[0] | BITS[1], BITS[0] | BITS[2],
+               BITS[1] | BITS[2], SEEN_ALL]
+    rng = random.Random(2)
+    for _ in range(200):
+        masks = [rng.choice(choices) for _ in range(6)]
+        slots = match_unseen(masks, PATTERNS, rng)
+        assert _unseen(masks, slots) == _best_unseen(masks)
+
+
+def test_falls_back_to_seen_slots():
+    masks = [SEEN_ALL] * 6
+    slots = match_unseen(masks, PATTERNS, random.Random(3))
+    assert Counter(slots) == {0: 2, 1: 2, 2: 2}
+
+    # everyone wants slot 0: two get it, the rest are spread over the others
+    masks = [BITS[1] | BITS[2]] * 6
+    slots = match_unseen(masks, PATTERNS, random.Random(3))
+    assert Counter(slots) == {0: 2, 1: 2, 2: 2}
+    assert _unseen(masks, slots) == 2
+
+
+def test_same_seed_same_assignment():
+    rng = random.Random(4)
+    masks = [rng.randrange(1 << len(PATTERN_BITS)) for _ in range(60)]
+    assert (match_unseen(masks, PATTERNS, random.Random(9))
+            == match_unseen(masks, PATTERNS, random.Random(9)))
+    a, b = random.Random(9), random.Random(9)
+    assert (group_matrix(range(60), match_unseen(masks, PATTERNS, a), 3, a)
+            == group_matrix(range(60), match_unseen(masks, PATTERNS, b), 3, b))
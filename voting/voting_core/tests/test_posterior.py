@@ -0,0 +1,56 @@
+"""
+POSTERIORS against Bayes' rule worked out by hand, with the signal model
+written out as literals: P(RED) = 1/2, P(strong) = 0.3, a strong source
+matches the state with 8/9, a weak one with 5/9.
+"""
+from itertools import product
+
+import pytest
+
+from voting_core.posterior import POSTERIORS
+from voting_core.triplets import SLOT_PATTERNS
+
+P_H, ACC = 0.3, {'h': 8 / 9, 'l': 5 / 9}
+
+
+def test_strong_red_against_a_bare_blue():
+    # bare 'b': the jar is unknown, P(b | BLUE) = 0.3 * 8/9 + 0.7 * 5/9 = 5.9/9
+    post = POSTERIORS[SLOT_PATTERNS['rh', '', 'b']]
+    assert post.p_red == pytest.approx((8 * 3.1) / (8 * 3.1 + 1 * 5.9))   # 0.8078
+    assert post.vote == 'R'
+
+
+def test_weak_red_against_strong_and_bare_blue():
+    post = POSTERIORS[SLOT_PATTERNS['rl', 'bh', 'b']]
+    red = 5 * 1 * 3.1           # 5/9 · 1/9 · 3.1/9
+    blue = 4 * 8 * 5.9          # 4/9 · 8/9 · 5.9/9
+    assert post.p_red == pytest.approx(red / (red + blue))               # 0.0759
+    assert post.vote == 'B'
+
+
+def _by_enumeration(tags) -> float:
+    """sum over the state and every unshown jar quality"""
+    hidden = [i for i, tag in enumerate(tags) if len(tag) == 1]
+    joint = {'R': 0.0, 'B': 0.0}
+    for state, qualities in product('RB', product('hl', repeat=len(hidden))):
+        p = 0.5
+        guess = dict(zip(hidden, qualities))
+        for i, tag in enumerate(tags):
+            if not tag:
+                continue
+            quality = tag[1] if len(tag) == 2 else guess[i]
+            if len(tag) == 1:
+                p *= P_H if quality == 'h' else 1 - P_H
+            match = (tag[0] == 'r') == (state == 'R')
+            p *= ACC[quality] if match else 1 - ACC[quality]
+        joint[state] += p
+    return joint['R'] / (joint['R'] + joint['B'])
+
+
+def test_every_pattern_by_enumeration():
+    for tags, pattern in SLOT_PATTERNS.items():
+        post = POSTERIORS[pattern]
+        p_red = _by_enumeration(tags)
+        assert post.p_red == pytest.approx(p_red), tags
+        assert post.vote == ('' if p_red == pytest.approx(0.5)
+                             else 'R' if p_red > 0.5 else 'B'), tags
@@ -0,0 +1,50 @@
+"""
+Block schedules for a whole session, created by oTree in an in-memory
+database. Run from the project directory.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from voting_core.schedule import TABLE_SIZE, table_size
+
+# the checked-in db.sqlite3 is not loaded: an ephemeral connection to the
+# in-memory engine stands in for it
+_CREATE = '''
+import sys
+import otree.database as d
+d.ephemeral_connection = d.engine.connect()
+from otree.main import setup
+setup()
+from otree.session import create_session
+with d.session_scope():
+    session = create_session(sys.argv[1], num_participants=int(sys.argv[2]))
+    for key, schedule in sorted(session.vars.items()):
+        if key.startswith('schedule_'):
+            print(key, schedule.num_players, len(schedule.members), len(schedule.states))
+'''
+
+
+class C:
+    PLAYERS_PER_GROUP = 3
+    NUM_ROUNDS = 20
+
+
+def test_table_size_grows_with_the_session():
+    assert table_size(60, C) == TABLE_SIZE
+    assert table_size(300, C) == 2 * 100 * 20
+
+
+@pytest.mark.parametrize('config', ['Voting', 'Voting_receiver'])
+def test_300_participant_session(config):
+    env = dict(os.environ, OTREE_IN_MEMORY='1', OTREE_EPHEMERAL='1')
+    out = subprocess.run([sys.executable, '-c', _CREATE, config, '300'], env=env,
+                         check=True, capture_output=True, text=True).stdout
+    rows = [line.split() for line in out.splitlines() if line.startswith('schedule_')]
+    assert len(rows) == 4
+    for key, num_players, members, states in rows:
+        rounds = int(states) // 100
+        assert num_players == '300' and int(members) == 300 * rounds
+        assert rounds in (10, 20)
@@ -0,0 +1,67 @@
+"""
+The simulator's vectorised info-flow rule against the live one.
+"""
+from itertools import product
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from voting_core import network
+from voting_core.network import DECISION_FIELDS, EVERYONE, GOT_B, GOT_R, NOBODY
+from voting_core.simulate import resolve_masks
+
+SIGNALS = list(product('rb', repeat=3))
+DECISIONS = list(product([NOBODY, GOT_R, GOT_B, EVERYONE], repeat=3))
+TREATMENTS = list(product(['send', 'receive'], ['partial', 'full']))
+
+
+class _Scripted:
+    """stands in for the live rng: the n-th choice takes option script[n]"""
+
+    def __init__(self, script):
+        self.script = iter(script)
+
+    def choice(self, seq):
+        return seq[next(self.script) % len(seq)]
+
+
+def _live_outcomes(C, signals, decisions, monkeypatch) -> set:
+    """every info mask triple resolve_info_flow can produce"""
+    group = SimpleNamespace(id=1, id_in_subsession=1)
+    players = [SimpleNamespace(id_in_group=i + 1, group_id=1, signals=s, qualities='h',
+                               **{DECISION_FIELDS[C.DIRECTION]: d})
+               for i, (s, d) in enumerate(zip(signals, decisions))]
+    subsession = SimpleNamespace(session=None, round_number=1,
+                                 get_players=lambda: players, get_groups=lambda: [group])
+    outcomes = set()
+    # at most one 3-way choice (the partial-sharing decider), then 2-way ones
+    for script in product(range(3), range(2), range(2), range(2)):
+        written = []
+        monkeypatch.setattr(network, 'stream', lambda *args: _Scripted(script))
+        monkeypatch.setattr(network, 'bulk_update', written.extend)
+        network.resolve_info_flow(subsession, C)
+        outcomes.add(tuple(fields['info_mask'] for _, fields in written))
+    return outcomes
+
+
+def _simulated_outcomes(C, reps=400) -> dict:
+    """every info mask triple resolve_masks produced, per (signals, decisions)"""
+    cases = list(product(SIGNALS, DECISIONS))
+    sig = np.array([[1 if s == 'r' else -1 for s in signals] for signals, _ in cases])
+    dec = np.array([decisions for _, decisions in cases])
+    masks = resolve_masks(C, np.repeat(sig, reps, axis=0), np.repeat(dec, reps, axis=0),
+                          np.random.default_rng(0))
+    outcomes = {case: set() for case in cases}
+    for case, row in zip(np.repeat(np.arange(len(cases)), reps), masks.tolist()):
+        outcomes[cases[case]].add(tuple(row))
+    return outcomes
+
+
+@pytest.mark.parametrize('direction, sharing', TREATMENTS)
+def test_resolve_masks_matches_resolve_info_flow(direction, sharing, monkeypatch):
+    C = SimpleNamespace(BLOCK='test', DIRECTION=direction, SHARING=sharing)
+    simulated = _simulated_outcomes(C)
+    for (signals, decisions), outcomes in simulated.items():
+        assert outcomes == _live_outcomes(C, signals, decisions, monkeypatch), \
+            (signals, decisions)
@@ -0,0 +1,25 @@
+"""
+Grid validation, before any simulation runs.
+"""
+import pytest
+
+from voting_core.sweep import check_grid, expand_grid
+
+APP = 'Voting_Block_Four_full_chat'
+
+
+def test_known_keys_pass():
+    check_grid(APP, expand_grid({'AMOUNT_CORRECT': [1, 2], 'p_strong': [0.3, 0.5],
+                                 'SHARING': ['partial', 'full']}))
+
+
+@pytest.mark.parametrize('key, hint', [('AMOUNT_CORECT', 'AMOUNT_CORRECT'),
+                                       ('p_strng', 'p_strong')])
+def test_unknown_keys_are_rejected(key, hint):
+    with pytest.raises(ValueError, match=f'did you mean {hint}'):
+        check_grid(APP, expand_grid({key: [1]}))
+
+
+def test_rounds_beyond_the_schedule_are_rejected():
+    with pytest.raises(ValueError, match='NUM_ROUNDS=99'):
+        check_grid(APP, expand_grid({'NUM_ROUNDS': [10, 99]}))
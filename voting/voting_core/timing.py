@@ -0,0 +1,212 @@
+import time
+from functools import wraps
+
+from otree.api import ExtraModel, Page, WaitPage, models
+from otree.database import db
+from otree.models import Participant, Session
+
+
+# ------------------------------------------------------------------
+#  Barrier timings
+# ------------------------------------------------------------------
+class BarrierTiming(ExtraModel):
+    """one row per released wait page (per group for group-level waits)"""
+    session        = models.Link(Session)
+    app            = models.StringField()
+    round_number   = models.IntegerField()
+    page           = models.StringField()
+    group          = models.IntegerField()     # id_in_subsession, 0 = all groups
+    players        = models.IntegerField()
+    arrival_spread = models.FloatField()       # first → last arrival (s)
+    callback       = models.FloatField()       # after_all_players_arrive (s)
+    flush          = models.FloatField()       # DB flush right after it (s)
+    released_at    = models.FloatField()       # epoch
+
+
+class BarrierArrival(ExtraModel):
+    """
+    when a participant first reached a wait page; written once, on
+    arrival, so every server process sees it and nothing is kept in memory
+    """
+    session      = models.Link(Session)
+    participant  = models.Link(Participant)
+    app          = models.StringField()
+    round_number = models.IntegerField()
+    page         = models.StringField()
+    arrived_at   = models.FloatField()     # epoch
+
+
+class TimedWaitPage(WaitPage):
+    """
+    WaitPage that records arrival spread, callback time and flush time
+    in BarrierTiming. Subclasses define is_displayed and
+    after_all_players_arrive as usual, or inherit them; both are wrapped
+    here.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        page, app = cls.__name__, cls.__module__
+        # unwrap what a timed parent page already wrapped
+        shown = getattr(cls, 'is_displayed')
+        shown = getattr(shown, 'untimed', shown)
+        aapa = cls.after_all_players_arrive
+        aapa = getattr(aapa, 'untimed', aapa)
+
+        def is_displayed(player):
+            displayed = shown(player)
+            if displayed:
+                _arrive(player, app, page)
+            return displayed
+
+        @wraps(aapa)
+        def after_all_players_arrive(self):
+            t0 = time.perf_counter()
+            aapa(self)
+            t1 = time.perf_counter()
+            db._db.flush()
+            t2 = time.perf_counter()
+            _record(self, app, page, t1 - t0, t2 - t1)
+
+        is_displayed.untimed = shown
+        after_all_players_arrive.untimed = aapa
+        cls.is_displayed = staticmethod(is_displayed)
+        cls.after_all_players_arrive = after_all_players_arrive
+
+
+def _arrive(player, app: str, page: str):
+    """is_displayed runs on every GET of the page; only the first one counts"""
+    where = dict(participant=player.participant, app=app,
+                 round_number=player.round_number, page=page)
+    if not BarrierArrival.filter(**where):
+        BarrierArrival.create(session=player.session, arrived_at=time.time(), **where)
+
+
+def _record(wp, app: str, page: str, callback: float, flush: float):
+    if wp.wait_for_all_groups:
+        players, group = wp.subsession.get_players(), 0
+    else:
+        players, group = wp.group.get_players(), wp.group.id_in_subsession
+    round_number = players[0].round_number
+    arrived = {a.participant_id: a.arrived_at for a in BarrierArrival.filter(
+        session=wp.session, app=app, round_number=round_number, page=page)}
+    arrivals = [arrived[p.participant_id] for p in players if p.participant_id in arrived]
+    now = time.time()
+    BarrierTiming.create(
+        session=wp.session, app=app, round_number=round_number,
+        page=page, group=group, players=len(players),
+        arrival_spread=max(arrivals) - min(arrivals) if arrivals else 0.0,
+        callback=callback, flush=flush, released_at=now,
+    )
+
+
+# ------------------------------------------------------------------
+#  Client-side page timings
+# ------------------------------------------------------------------
+#   _static/global/page_timing.js posts 'page_events' with every form:
+#   visible,first_input,decision,submit,hidden — ms since the page was
+#   requested ('' when it never happened; hidden = time the tab was in
+#   the background)
+PAGE_EVENTS = ['visible', 'first_input', 'decision', 'submit', 'hidden']
+
+
+def _parse_events(text: str) -> list:
+    values = (text.split(',') + [''] * len(PAGE_EVENTS))[:len(PAGE_EVENTS)]
+    return [int(v) if v.isdigit() else None for v in values]
+
+
+class TimedPage(Page):
+    """
+    Page whose client timings are appended to participant.page_log, one
+    [app, page, round, *PAGE_EVENTS, accepted] entry per submit (submits
+    rejected by error_message included). page_events is a declared form
+    field, so every app's Player has
+        page_events = models.StringField(blank=True)
+    and it is added to every subclass's form_fields. Templates load the
+    recorder with {{ include "voting_core/page_timing.html" }}.
+    """
+    form_model = 'player'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        page, app = cls.__name__, cls.__module__
+        if 'page_events' not in cls.form_fields:
+            cls.form_fields = [*cls.form_fields, 'page_events']
+        before = cls.before_next_page
+        before = getattr(before, 'untimed', before)
+
+        def before_next_page(player, timeout_happened=False):
+            before(player, timeout_happened=timeout_happened)
+            _log_events(player, app, page, player.page_events, True)
+
+        before_next_page.untimed = before
+        cls.before_next_page = staticmethod(before_next_page)
+
+        check = getattr(cls, 'error_message', None)
+        check = getattr(check, 'untimed', check)
+        if check:
+            def error_message(player, values):
+                error = check(player, values)
+                if error:
+                    _log_events(player, app, page, values.get('page_events'), False)
+                return error
+
+            error_message.untimed = check
+            cls.error_message = staticmethod(error_message)
+
+
+def _log_events(player, app: str, page: str, events: str, accepted: bool):
+    if events:
+        player.participant.vars.setdefault('page_log', []).append(
+            [app, page, player.round_number, *_parse_events(events), accepted])
+
+
+# ------------------------------------------------------------------
+#  Admin report and export
+# ------------------------------------------------------------------
+EXPORT_FIELDS = ['app', 'round_number', 'page', 'group', 'players',
+                 'arrival_spread', 'callback', 'flush', 'released_at']
+
+
+def barrier_report_vars(subsession) -> dict:
+    """
+    vars_for_admin_report: this round's barriers, plus every barrier of
+    the session summarised (ms), slowest callback first
+    """
+    rows = BarrierTiming.filter(session=subsession.session)
+    app = type(subsession).__module__
+
+    summary = {}
+    for row in rows:
+        s = summary.setdefault((row.app, row.page), dict(
+            app=row.app, page=row.page, n=0, spread=0.0, callback=0.0, flush=0.0,
+            max_spread=0.0, max_callback=0.0, max_flush=0.0))
+        s['n'] += 1
+        for f in ('spread', 'callback', 'flush'):
+            v = (row.arrival_spread if f == 'spread' else getattr(row, f)) * 1000
+            s[f] += v
+            s[f'max_{f}'] = max(s[f'max_{f}'], v)
+    for s in summary.values():
+        for f in ('spread', 'callback', 'flush'):
+            s[f] = round(s[f] / s['n'], 1)
+            s[f'max_{f}'] = round(s[f'max_{f}'], 1)
+
+    this_round = [
+        dict(page=r.page, group=r.group or 'all', players=r.players,
+             spread=round(r.arrival_spread * 1000, 1),
+             callback=round(r.callback * 1000, 1), flush=round(r.flush * 1000, 1))
+        for r in rows if r.app == app and r.round_number == subsession.round_number
+    ]
+    return dict(
+        barrier_rows=this_round,
+        barrier_summary=sorted(summary.values(), key=lambda s: -s['max_callback']),
+    )
+
+
+def barrier_export(players):
+    """custom_export rows for every session the exported players belong to"""
+    yield ['session'] + EXPORT_FIELDS
+    sessions = {p.session.id: p.session for p in players}
+    for session in sessions.values():
+        for row in BarrierTiming.filter(session=session):
+            yield [session.code] + [getattr(row, f) for f in EXPORT_FIELDS]
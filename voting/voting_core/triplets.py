@@ -0,0 +1,114 @@
+import random
+from types import MappingProxyType
+
+
+# ================================================================
+# Triplet patterns (24 rows × 2 each = 48 triples)
+# ================================================================
+TRIPLE_ROWS: list[tuple[tuple[str, str, str], tuple[str, str, str]]] = [
+    (('rh', 'bh', 'rl'), ('bh', 'rh', 'bl')),
+    (('rh', 'bh', 'rh'), ('bh', 'rh', 'bh')),
+    (('rh', 'bl', 'rh'), ('bh', 'rl', 'bh')),
+    (('rh', 'bl', 'rl'), ('bh', 'rl', 'bl')),
+    (('rl', 'bh', 'rl'), ('bl', 'rh', 'bl')),
+    (('rl', 'bl', 'rl'), ('bl', 'rl', 'bl')),
+    (('r', 'bh', 'r'), ('b', 'rh', 'b')),
+    (('r', 'bl', 'r'), ('b', 'rl', 'b')),
+    (('rh', 'b', 'r'),   ('bh', 'r', 'b')),
+    (('rl', 'b', 'r'),   ('bl', 'r', 'b')),
+    (('rh', 'bh', 'r'),  ('bh', 'rh', 'b')),
+    (('rh', 'bl', 'r'),  ('bh', 'rl', 'b')),
+    (('rl', 'bh', 'r'),  ('bl', 'rh', 'b')),
+    (('rl', 'bl', 'r'),  ('bl', 'rl', 'b')),
+    (('rh', 'b', 'rl'),  ('bh', 'r', 'bl')),
+    (('rh', 'b', 'rh'),  ('bh', 'r', 'bh')),
+    (('rl', 'b', 'rl'),  ('bl', 'r', 'bl')),
+    (('rl', '', ''),     ('bl', '', '')),
+    (('rh', '', ''),     ('bh', '', '')),
+    (('r',   '', ''),    ('b',  '', '')),
+    (('r', 'bl', ''), ('b', 'rl', '')),
+    (('rh', 'b', ''),    ('bh', 'r', '')),
+    (('rh', 'bl', ''),   ('bh', 'rl', '')),
+    (('rh',  'bh', ''),  ('bl', 'rl', '')),
+]
+ALL_TRIPLES: list[tuple[str, str, str]] = [t for pair in TRIPLE_ROWS for t in pair]
+
+
+# every tag a slot can show: nothing, signal only, signal + quality
+TAGS = ('', 'r', 'b', 'rh', 'rl', 'bh', 'bl')
+
+
+def _slot_pattern(tag: str, others) -> str:
+    """own tag + the other two tags, sorted ('' shown as '0')"""
+    return f"{tag}+{''.join(o if o else '0' for o in sorted(others))}"
+
+
+# ------------------------------------------------------------------
+#  Lookup tables, built once at import
+# ------------------------------------------------------------------
+# (own tag, other tag, other tag) → pattern, both orders of the others
+SLOT_PATTERNS = MappingProxyType({
+    (tag, a, b): _slot_pattern(tag, (a, b))
+    for tag in TAGS for a in TAGS for b in TAGS
+})
+
+
+def _expand(trip) -> tuple[str, str, str]:
+    t0, t1, t2 = trip
+    return (SLOT_PATTERNS[t0, t1, t2],
+            SLOT_PATTERNS[t1, t0, t2],
+            SLOT_PATTERNS[t2, t0, t1])
+
+
+# triple → one pattern per slot / sorted tag signature
+TRIPLE_PATTERNS = MappingProxyType({trip: _expand(trip) for trip in ALL_TRIPLES})
+TRIPLE_SIGNATURES = MappingProxyType({trip: ''.join(sorted(trip)) for trip in ALL_TRIPLES})
+
+
+def expand_triplet(trip) -> tuple[str, str, str]:
+    """
+    ('rh','b','') → ('rh+0b', 'b+0rh', '+brh')
+    works for any three tags, not only the scheduled triples
+    """
+    trip = tuple(trip)
+    patterns = TRIPLE_PATTERNS.get(trip)
+    return patterns if patterns is not None else _expand(trip)
+
+
+def tag_signature(tags) -> str:
+    """('rh','bh','rl') → 'bhrhrl' (order of the slots does not matter)"""
+    tags = tuple(tags)
+    sig = TRIPLE_SIGNATURES.get(tags)
+    return sig if sig is not None else ''.join(sorted(tags))
+
+
+# ------------------------------------------------------------------
+#  Triplet schedule
+# ------------------------------------------------------------------
+def build_triple_order(sections, rows_first: bool = False,
+                       rng=random) -> list[tuple[str, str, str]]:
+    """
+    sections:   (start, end, quota) slices of TRIPLE_ROWS; a section gives
+                `quota` triples, at most one per row until all its rows are used
+    rows_first: keep each section's one-per-row picks ahead of its extras
+                instead of shuffling the whole schedule
+    rng:        anything with the random.Random interface (default: the
+                module-level generator)
+    """
+    picks: list[tuple[str, str, str]] = []
+    for start, end, quota in sections:
+        rows = TRIPLE_ROWS[start:end]
+        if quota <= len(rows):
+            row_picks = [rng.choice(row) for row in rng.sample(rows, quota)]
+            extras = []
+        else:
+            row_picks = [rng.choice(row) for row in rows]
+            remaining = [t for row in rows for t in row if t not in row_picks]
+            extras = rng.sample(remaining, quota - len(rows))
+        if rows_first:
+            rng.shuffle(row_picks)
+            rng.shuffle(extras)
+        picks.extend(row_picks + extras)
+    if not rows_first:
+        rng.shuffle(picks)
+    return picks